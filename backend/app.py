@@ -1,17 +1,38 @@
-import os
+import logging, os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt
 from dotenv import load_dotenv
 
 load_dotenv()
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                    format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 def create_app():
     app = Flask(__name__)
     CORS(app)
+    from throttle import FORWARDED_SECRET, FrontendProxyFix
+    if FORWARDED_SECRET:
+        # tarayıcı IP'si frontend'den X-Forwarded-For ile gelir (login/register IP sınırı)
+        app.wsgi_app = FrontendProxyFix(app.wsgi_app, FORWARDED_SECRET)
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET", "change-this-in-prod")
     JWTManager(app)
 
+    import encoding, metrics, models
+    from pool import PoolTimeout
+    from hashing import HashingBusy
+    models.init_app(app)
+    metrics.init_app(app)  # /metrics + istek / SQL süreleri
+    encoding.init_app(app)  # hızlı JSON + gzip/br (after_request: metrics'ten önce çalışır, süreye dahil)
+
+    @app.errorhandler(PoolTimeout)
+    def db_busy(e):
+        return jsonify(msg="database busy, retry"), 503
+
+    @app.errorhandler(HashingBusy)
+    def auth_busy(e):
+        return jsonify(msg="auth busy, retry"), 503, {"Retry-After": "1"}
+
     @app.get("/health")
     def health():
         return jsonify(status="ok"), 200
@@ -21,6 +42,14 @@ def create_app():
     def routes():
         return jsonify(sorted([str(r.rule) for r in app.url_map.iter_rules()]))
 
+    # Teşhis: DB havuz istatistikleri (in_use / idle / bekleme süresi; replikalar: sağlık + gecikme)
+    @app.get("/pool")
+    def pool_stats():
+        stats = models.get_pool().stats()
+        if models.get_replicas():
+            stats["replicas"] = models.get_replicas().stats()
+        return jsonify(stats), 200
+
     # /whoami (JWT zorunlu)
     @app.get("/whoami")
     @jwt_required()
@@ -40,7 +69,8 @@ def create_app():
     return app
 
 if __name__ == "__main__":
-    # Teşhis: Hangi dosyadan çalışıyoruz?
-    print("STARTING APP FROM:", os.path.abspath(__file__))
+    # Geliştirme sunucusu; üretimde: gunicorn -c gunicorn.conf.py wsgi:app
     app = create_app()
+    # Teşhis: Hangi dosyadan çalışıyoruz?
+    logging.getLogger(__name__).info("starting app from %s", os.path.abspath(__file__))
     app.run(host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
@@ -1,36 +1,72 @@
+import logging, os
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
-from models import create_user, get_user_by_email, verify_password
+import hashing
+import repository as repo
+from throttle import SlidingWindow, client_ip
+from models import release_db
+from hashing import HashingBusy
 import datetime
 from users import users_bp
 
 
+log = logging.getLogger(__name__)
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
+# bcrypt pahalı: e-posta ve IP başına deneme sınırı
+LOGIN_WINDOW = float(os.getenv("LOGIN_WINDOW", "300"))
+_per_email = SlidingWindow(int(os.getenv("LOGIN_MAX_PER_EMAIL", "10")), LOGIN_WINDOW)
+_per_ip = SlidingWindow(int(os.getenv("LOGIN_MAX_PER_IP", "50")), LOGIN_WINDOW)
+
+def _throttled(*checks):
+    for limiter, key in checks:
+        if key is None:
+            continue  # IP bilinmiyor (frontend iletmedi): yalnızca e-posta sınırı
+        wait = limiter.hit(key)
+        if wait:
+            return {"msg":"too many attempts"}, 429, {"Retry-After": str(int(wait) + 1)}
+    return None
+
 @auth_bp.post("/register")
 def register():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True)
+    data = data if isinstance(data, dict) else {}
     email = data.get("email")
     password = data.get("password")
     role = data.get("role","basic")
     if not email or not password:
         return {"msg":"email/password required"}, 400
+    limited = _throttled((_per_ip, client_ip(request)))
+    if limited: return limited
     try:
-        create_user(email, password, role)
+        repo.users.create(email, hashing.hash_password(password), role)
         return {"msg":"registered"}, 201
+    except HashingBusy:
+        raise
     except Exception as e:
-        print("REGISTER_ERROR:", repr(e))
+        log.warning("register failed for %s: %r", email, e)
         return {"msg":"email exists or db error"}, 400
 
 
 @auth_bp.post("/login")
 def login():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True)
+    data = data if isinstance(data, dict) else {}
     email = data.get("email","")
     password = data.get("password","")
-    u = get_user_by_email(email)
-    if not u or not verify_password(password, u["password_hash"]):
+    if not isinstance(email, str) or not isinstance(password, str):
+        return {"msg":"bad credentials"}, 401
+    limited = _throttled((_per_ip, client_ip(request)), (_per_email, email.lower()))
+    if limited: return limited
+    u = repo.users.by_email(email)
+    # bcrypt beklerken havuz bağlantısı tutulmasın: login patlaması diğer istekleri aç bırakmaz
+    release_db()
+    if not u or not hashing.check_password(password, u["password_hash"]):
         return {"msg":"bad credentials"}, 401
+    _per_email.reset(email.lower())
+    # BCRYPT_ROUNDS değişmişse hash başarılı girişte şeffafça yenilenir
+    if hashing.needs_rehash(u["password_hash"]):
+        repo.users.set_password_hash(u["id"], hashing.hash_password(password))
     token = create_access_token(
     identity=str(u["id"]),
 
@@ -0,0 +1,283 @@
+# backend/bench.py
+# Yük testi / benchmark: veri seti kurar, eşzamanlı istemcilerle API'yi sürer,
+# uç nokta başına throughput ve p50/p95/p99 gecikme + istek başına SQL sayısı raporlar.
+#
+#   DB_BACKEND=sqlite SQLITE_PATH=/tmp/bench.sqlite3 python bench.py --users 1000 --tasks 1000000
+#   python bench.py --url http://127.0.0.1:8000 ...   # çalışan bir sunucuya karşı (aynı DB env'i ile)
+#   python bench.py compare old.json new.json
+import argparse, datetime, http.client, json, os, random, subprocess, sys, threading, time
+from urllib.parse import urlsplit
+
+# Gömülü modda: ölçümü sınırlayıcılar değil sunucu belirlesin
+os.environ.setdefault("DB_QUERY_HEADER", "1")
+os.environ.setdefault("LOGIN_MAX_PER_IP", "1000000000")
+os.environ.setdefault("LOGIN_MAX_PER_EMAIL", "1000000000")
+
+PASSWORD = "bench-pass"
+ADMIN_EMAIL = "bench-admin@example.com"
+
+# (ad, ağırlık)
+MIX = [("tasks.list", 50), ("tasks.create", 15), ("tasks.update", 15),
+       ("tasks.delete", 10), ("users.list", 10)]
+
+
+def _email(i):
+    return f"bench-u{i}@example.com"
+
+def seed(n_users, n_tasks, batch=5000, rng=None):
+    """Insert users and tasks straight through the pool (much faster than the API)."""
+    import hashing
+    from models import pooled_connection
+    rng = rng or random.Random(0)
+    pw_hash = hashing.hash_password(PASSWORD)
+    now = datetime.datetime.utcnow()
+    with pooled_connection() as conn:
+        with conn.cursor() as c:
+            c.execute("DELETE FROM tasks WHERE user_id IN (SELECT id FROM users WHERE email LIKE 'bench-%%')")
+            c.execute("DELETE FROM users WHERE email LIKE 'bench-%%'")
+            rows = [(_email(i), pw_hash, "basic") for i in range(n_users)] + [(ADMIN_EMAIL, pw_hash, "admin")]
+            c.executemany("INSERT INTO users(email,password_hash,role) VALUES(%s,%s,%s)", rows)
+            c.execute("SELECT id FROM users WHERE email LIKE 'bench-u%%'")
+            uids = [r["id"] for r in c.fetchall()]
+        done = 0
+        while done < n_tasks:
+            k = min(batch, n_tasks - done)
+            conn.begin()
+            with conn.cursor() as c:
+                c.executemany(
+                    "INSERT INTO tasks(title,description,status,user_id,created_at,updated_at) VALUES(%s,%s,%s,%s,%s,%s)",
+                    [(f"task {done + j}", "x" * rng.randint(0, 200), rng.choice(("todo", "done")), rng.choice(uids), ts, ts)
+                     for j in range(k)
+                     for ts in [now - datetime.timedelta(seconds=rng.randint(0, 86400 * 365))]])
+            conn.commit()
+            done += k
+    return len(uids)
+
+
+class EmbeddedClient:
+    """In-process Flask test client (no network, measures app + DB only)."""
+    _app = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        with EmbeddedClient._lock:
+            if EmbeddedClient._app is None:
+                from app import create_app
+                EmbeddedClient._app = create_app()
+        self._c = EmbeddedClient._app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        r = self._c.open(path, method=method, json=body, headers=headers or {})
+        return r.status_code, r.get_json(silent=True), r.headers.get("X-DB-Queries")
+
+
+class HTTPClient:
+    """Keep-alive HTTP client against a running server."""
+
+    def __init__(self, url):
+        u = urlsplit(url)
+        self._conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=30)
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            self._conn.request(method, path, body=data, headers=headers)
+            r = self._conn.getresponse()
+            raw = r.read()
+        except (OSError, http.client.HTTPException):
+            self._conn.close()
+            return 599, None, None
+        try:
+            js = json.loads(raw) if raw else None
+        except ValueError:
+            js = None
+        return r.status, js, r.getheader("X-DB-Queries")
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}  # name -> list[(seconds, status, queries)]
+
+    def add(self, name, seconds, status, queries):
+        with self._lock:
+            self.samples.setdefault(name, []).append((seconds, status, queries))
+
+    def timed(self, client, name, method, path, body=None, headers=None):
+        t0 = time.perf_counter()
+        status, js, q = client.request(method, path, body, headers)
+        self.add(name, time.perf_counter() - t0, status, q)
+        return status, js
+
+
+def _pct(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+def summarize(rec, wall):
+    out = {}
+    for name, samples in sorted(rec.samples.items()):
+        lat = sorted(s[0] * 1000 for s in samples)
+        errors = sum(1 for s in samples if s[1] >= 400)
+        queries = [int(s[2]) for s in samples if s[2] is not None]
+        out[name] = {
+            "count": len(samples),
+            "errors": errors,
+            "rps": round(len(samples) / wall, 2),
+            "p50_ms": round(_pct(lat, 50), 3),
+            "p95_ms": round(_pct(lat, 95), 3),
+            "p99_ms": round(_pct(lat, 99), 3),
+            "mean_ms": round(sum(lat) / len(lat), 3),
+            "db_queries_avg": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+    return out
+
+
+def _login(rec, client, email):
+    status, js = rec.timed(client, "auth.login", "POST", "/api/auth/login",
+                           {"email": email, "password": PASSWORD})
+    if status != 200:
+        raise RuntimeError(f"login failed for {email}: {status} {js}")
+    return {"Authorization": "Bearer " + js["access_token"]}
+
+def client_login(rec, make_client, n_users, seed_, out):
+    """Log one client in (before the clock starts); failures are recorded, not raised."""
+    rng = random.Random(seed_)
+    client = make_client()
+    try:
+        admin = _login(rec, client, ADMIN_EMAIL)
+        auth = _login(rec, client, _email(rng.randrange(n_users)))
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return
+    out.append((client, admin, auth, rng))
+
+def client_loop(rec, client, admin, auth, rng, deadline):
+    names, weights = zip(*MIX)
+    mine = []  # bu istemcinin oluşturduğu görevler (update/delete hedefleri)
+    while time.monotonic() < deadline:
+        op = rng.choices(names, weights)[0]
+        if op == "tasks.list":
+            rec.timed(client, op, "GET", "/api/tasks?limit=50", headers=auth)
+        elif op == "tasks.create" or not mine:
+            status, js = rec.timed(client, "tasks.create", "POST", "/api/tasks",
+                                   {"title": "bench", "description": "created by bench"}, auth)
+            if status == 201 and js and js.get("id"):
+                mine.append(js["id"])
+        elif op == "tasks.update":
+            rec.timed(client, op, "PATCH", f"/api/tasks/{rng.choice(mine)}", {"status": "done"}, auth)
+        elif op == "tasks.delete":
+            rec.timed(client, op, "DELETE", f"/api/tasks/{mine.pop()}", headers=auth)
+        else:
+            rec.timed(client, op, "GET", "/api/users", headers=admin)
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def run(args):
+    if not args.url:
+        # gömülü mod: ölçülen API, bcrypt maliyeti değil (plancheck.py ile aynı)
+        os.environ.setdefault("BCRYPT_ROUNDS", "4")
+        os.environ.setdefault("BCRYPT_WORKERS", "0")
+    rng = random.Random(args.seed)
+    if not args.no_seed:
+        t0 = time.perf_counter()
+        n_users = seed(args.users, args.tasks, rng=rng)
+        print(f"seeded {n_users} users / {args.tasks} tasks in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    make_client = (lambda: HTTPClient(args.url)) if args.url else EmbeddedClient
+    if not args.url:
+        EmbeddedClient()  # uygulamayı thread'lerden önce kur
+
+    # önce tüm istemciler giriş yapar: ölçüm penceresi ve throughput login'leri içermez
+    logins, ready = Recorder(), []
+    threads = [threading.Thread(target=client_login, args=(logins, make_client, args.users, args.seed + i, ready))
+               for i in range(args.clients)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    login_wall = time.perf_counter() - t0
+    if len(ready) < args.clients:
+        print(f"warning: {args.clients - len(ready)} of {args.clients} clients failed to log in", file=sys.stderr)
+
+    rec = Recorder()
+    deadline = time.monotonic() + args.duration
+    threads = [threading.Thread(target=client_loop, args=(rec, *c, deadline)) for c in ready]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+
+    result = {
+        "rev": _git_rev(),
+        "when": datetime.datetime.utcnow().isoformat() + "Z",
+        "target": args.url or f"embedded:{os.getenv('DB_BACKEND', 'mysql')}",
+        "params": {"users": args.users, "tasks": args.tasks, "clients": args.clients,
+                   "duration": args.duration, "seed": args.seed},
+        "clients_ok": len(ready),
+        "wall_s": round(wall, 3),
+        "login": summarize(logins, login_wall).get("auth.login"),
+        "endpoints": summarize(rec, wall),
+    }
+    return result
+
+def print_table(result, out=sys.stderr):
+    print(f"{'endpoint':<14}{'count':>8}{'err':>6}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>7}", file=out)
+    rows = list(result["endpoints"].items())
+    if result.get("login"):
+        rows.append(("(login)", result["login"]))  # ölçüm penceresi dışında
+    for name, r in rows:
+        q = "" if r["db_queries_avg"] is None else r["db_queries_avg"]
+        print(f"{name:<14}{r['count']:>8}{r['errors']:>6}{r['rps']:>10}{r['p50_ms']:>9}"
+              f"{r['p95_ms']:>9}{r['p99_ms']:>9}{q:>7}", file=out)
+
+def compare(old_path, new_path):
+    old, new = (json.load(open(p)) for p in (old_path, new_path))
+    print(f"{old.get('rev')} -> {new.get('rev')}")
+    print(f"{'endpoint':<14}{'rps':>26}{'p95 ms':>28}{'p99 ms':>28}")
+    for name in sorted(set(old["endpoints"]) | set(new["endpoints"])):
+        a, b = old["endpoints"].get(name), new["endpoints"].get(name)
+        if not a or not b:
+            print(f"{name:<14}  (only in {'new' if b else 'old'})")
+            continue
+        def d(k):
+            return f"{a[k]}→{b[k]} ({(b[k] - a[k]) / a[k] * 100:+.0f}%)" if a[k] else f"{a[k]}→{b[k]}"
+        print(f"{name:<14}{d('rps'):>26}{d('p95_ms'):>28}{d('p99_ms'):>28}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compare"]:
+        return compare(*argv[1:3])
+    ap = argparse.ArgumentParser(description="Task Manager API benchmark")
+    ap.add_argument("--users", type=int, default=100)
+    ap.add_argument("--tasks", type=int, default=10000)
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    ap.add_argument("--no-seed", action="store_true", help="reuse the data set from a previous run")
+    ap.add_argument("--out", help="write JSON results here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    result = run(args)
+    print_table(result)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
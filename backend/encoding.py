@@ -0,0 +1,99 @@
+# backend/encoding.py
+# Yanıt kodlama: hızlı JSON (orjson varsa) + Accept-Encoding ile pazarlık edilen sıkıştırma.
+#   JSON_FAST=0            -> Flask'ın varsayılan JSON sağlayıcısı
+#   COMPRESS_MIN_BYTES=0   -> sıkıştırma kapalı
+import datetime, decimal, gzip, json, os
+from flask import request
+from flask.json.provider import JSONProvider
+from cache import TTLCache
+
+try:
+    import orjson
+except ImportError:  # yerel ortam: stdlib ile aynı çıktı, yalnızca daha yavaş
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_FAST = os.getenv("JSON_FAST", "1") == "1"
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))  # bunun altı: sıkıştırma kazancı başlıklara gider
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "5"))
+BR_QUALITY = int(os.getenv("COMPRESS_BR_QUALITY", "4"))  # dinamik yanıt: yüksek kalite CPU'ya değmez
+COMPRESS_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def default(o):
+    """Types the encoders do not handle natively (orjson covers datetime/date itself)."""
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, bytes):
+        return o.decode("utf-8", "replace")
+    raise TypeError(f"not JSON serializable: {type(o).__name__}")
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON; datetimes as ISO 8601 with either encoder."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONProvider(JSONProvider):
+    """app.json: jsonify / get_json go through dumps() above, bytes straight into the response."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) if orjson is not None else json.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype="application/json")
+
+
+# ---------- Sıkıştırma ----------
+_CODERS = {"gzip": lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0)}
+if brotli is not None:
+    _CODERS["br"] = lambda data: brotli.compress(data, quality=BR_QUALITY)
+_PREFERENCE = [c for c in ("br", "gzip") if c in _CODERS]  # eşit q: daha küçük çıktı önce
+
+# ETag'li yanıtlar (liste sayfaları) aynı içerikle tekrar gelir: sıkıştırılmış hali saklanır
+_compressed = TTLCache(int(os.getenv("COMPRESS_CACHE_SIZE", "128")), float(os.getenv("COMPRESS_CACHE_TTL", "60")))
+
+def _compressible(resp):
+    if resp.direct_passthrough or resp.is_streamed or "Content-Encoding" in resp.headers:
+        return False  # dosya / akış (export kendi gzip'ini yapar) / zaten kodlanmış
+    if not 200 <= resp.status_code < 300 or resp.status_code in (204, 206):
+        return False
+    return (resp.mimetype or "").startswith(COMPRESS_TYPES) and resp.content_length is not None \
+        and resp.content_length >= COMPRESS_MIN_BYTES
+
+def compress(resp):
+    if not _compressible(resp):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    coding = request.accept_encodings.best_match(_PREFERENCE)
+    if coding is None:
+        return resp
+    etag, weak = resp.get_etag()
+    key = (request.path, etag, coding) if etag else None
+    body = _compressed.get(key) if key else None
+    if body is None:
+        body = _CODERS[coding](resp.get_data())
+        if key:
+            _compressed.set(key, body)
+    resp.set_data(body)
+    resp.headers["Content-Encoding"] = coding
+    if etag and not weak:
+        # gövde baytları değişti: güçlü ETag artık bu temsil için doğru değil
+        resp.set_etag(etag, weak=True)
+    return resp
+
+def init_app(app):
+    if JSON_FAST:
+        app.json = FastJSONProvider(app)
+    if COMPRESS_MIN_BYTES > 0:
+        app.after_request(compress)
@@ -0,0 +1,29 @@
+# backend/export.py
+# NDJSON export: repository'nin unbuffered cursor'dan okuduğu satır grupları akış olarak gönderilir
+import zlib
+from flask import Response, request
+from encoding import dumps
+
+def ndjson_response(batches, filename="export.ndjson"):
+    # q değerleriyle pazarlık (gzip;q=0 = istemez), encoding.compress ile aynı kural
+    gzip = request.accept_encodings.best_match(["gzip"]) == "gzip"
+
+    def generate():
+        z = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        for batch in batches:
+            chunk = b"".join(dumps(r) + b"\n" for r in batch)
+            if z:
+                # SYNC_FLUSH: istemci her batch'i beklemeden açabilsin
+                chunk = z.compress(chunk) + z.flush(zlib.Z_SYNC_FLUSH)
+            yield chunk
+        if z:
+            yield z.flush()
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Accel-Buffering": "no",
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return Response(generate(), mimetype="application/x-ndjson", headers=headers)
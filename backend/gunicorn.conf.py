@@ -0,0 +1,43 @@
+# backend/gunicorn.conf.py
+# Üretim sunucusu ayarları; değerler backend ConfigMap'inden (env) gelir
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_WORKERS", "2"))
+threads = int(os.getenv("WEB_THREADS", "4"))
+worker_class = "gthread"
+
+# create_app master'da bir kez yüklenir, worker'lar fork ile paylaşır
+preload_app = True
+
+# Kubernetes rollout: SIGTERM -> yeni istek alma, açıktakileri bitir
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "25"))
+timeout = int(os.getenv("WEB_TIMEOUT", "30"))
+keepalive = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+# bellek sızıntısına karşı worker'ları ara ara yenile
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "500"))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # METRICS_DIR: önceki çalıştırmadan kalan worker anlık görüntülerini temizle
+    import metrics
+    metrics.clear_dir()
+
+
+def post_fork(server, worker):
+    # preload sırasında açılmış olabilecek bağlantılar fork'ta paylaşılmasın:
+    # her worker kendi DB havuzunu kurar
+    import models
+    models.reset_pool()
+
+
+def worker_exit(server, worker):
+    # SIGTERM sonrası boştaki MySQL bağlantılarını düzgünce kapat
+    import metrics, models
+    metrics.retire()
+    models.close_pools()
@@ -0,0 +1,90 @@
+# backend/hashing.py
+# bcrypt istek thread'inde değil, sınırlı bir process havuzunda çalışır
+import logging, multiprocessing, os, threading, time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+import metrics
+
+ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+WORKERS = int(os.getenv("BCRYPT_WORKERS", "1"))
+QUEUE = int(os.getenv("BCRYPT_QUEUE", "2"))
+TIMEOUT = float(os.getenv("BCRYPT_TIMEOUT", "10"))
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is at capacity; callers answer 503."""
+
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _check(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+# çalışan + kuyruk kadar iş kabul edilir, fazlası beklemeden reddedilir. Bekleyen her iş bir
+# istek thread'i tutar: kapasite WEB_THREADS'in altında kalmalı, yoksa login patlaması
+# 503'e düşmeden önce tüm thread'leri doldurur
+_THREADS = int(os.getenv("WEB_THREADS", "4"))
+CAPACITY = max(WORKERS, 1) + QUEUE
+if CAPACITY >= _THREADS:
+    logging.getLogger(__name__).warning(
+        "BCRYPT_WORKERS + BCRYPT_QUEUE (%d) >= WEB_THREADS (%d); capping at %d",
+        CAPACITY, _THREADS, max(_THREADS - 1, 1))
+    CAPACITY = max(_THREADS - 1, 1)
+_slots = threading.BoundedSemaphore(CAPACITY)
+
+def _get_executor():
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _lock:
+            if _executor is None or _executor_pid != os.getpid():
+                # spawn: çok thread'li süreçten fork etmek güvenli değil
+                _executor = ProcessPoolExecutor(WORKERS, mp_context=multiprocessing.get_context("spawn"))
+                _executor_pid = os.getpid()
+    return _executor
+
+def _run(op, fn, *args):
+    global _executor
+    if not _slots.acquire(blocking=False):
+        metrics.inc("bcrypt_rejected_total", op=op, reason="full")
+        raise HashingBusy("password hashing pool is full")
+    t0 = time.perf_counter()
+    future = None
+    try:
+        if WORKERS <= 0:
+            return fn(*args)  # BCRYPT_WORKERS=0: aynı süreçte (geliştirme / test)
+        future = _get_executor().submit(fn, *args)
+        # slot iş gerçekten bitince boşalır: zaman aşımında havuzda süren iş kapasiteden düşmez
+        future.add_done_callback(lambda _: _slots.release())
+        return future.result(timeout=TIMEOUT)
+    except BrokenProcessPool:
+        # bir worker öldü (OOM vb.): havuz bir sonraki çağrıda yeniden kurulur
+        _executor = None
+        metrics.inc("bcrypt_rejected_total", op=op, reason="broken")
+        raise HashingBusy("password hashing pool restarting")
+    except FutureTimeout:
+        future.cancel()  # hâlâ kuyruktaysa hiç çalışmasın (slot da hemen boşalır)
+        metrics.inc("bcrypt_rejected_total", op=op, reason="timeout")
+        raise HashingBusy("password hashing timed out")
+    finally:
+        if future is None:
+            _slots.release()
+        metrics.observe("bcrypt_duration_seconds", time.perf_counter() - t0, op=op)
+
+def hash_password(password: str) -> str:
+    return _run("hash", _hash, password.encode("utf-8"), ROUNDS).decode("utf-8")
+
+def check_password(password: str, password_hash: str) -> bool:
+    return _run("check", _check, password.encode("utf-8"), password_hash.encode("utf-8"))
+
+def needs_rehash(password_hash: str) -> bool:
+    # $2b$12$... -> maliyet BCRYPT_ROUNDS'tan farklıysa girişte yeniden hash'lenir
+    try:
+        return int(password_hash.split("$")[2]) != ROUNDS
+    except (IndexError, ValueError):
+        return True
@@ -0,0 +1,59 @@
+# backend/jobs.py
+# Arka plan işleri (Kubernetes CronJob / elle), birden çok iş sırayla verilebilir:
+#   python jobs.py archive            # ARCHIVE_AFTER_DAYS'ten eski 'done' görevleri tasks_archive'a taşı
+#   python jobs.py prune-tombstones   # değişiklik akışı saklama süresini aşan tombstone'ları sil
+#   python jobs.py reconcile-stats    # istatistik sayaçlarını tasks'tan yeniden say, sapmaları düzelt
+import argparse, datetime, logging, os, sys, time
+
+log = logging.getLogger("jobs")
+
+ARCHIVE_AFTER = datetime.timedelta(days=int(os.getenv("ARCHIVE_AFTER_DAYS", "30")))
+BATCH = int(os.getenv("JOB_BATCH", "500"))
+PAUSE = float(os.getenv("JOB_PAUSE_MS", "50")) / 1000  # batch'ler arası: etkileşimli yazmalara yer aç
+BUDGET = float(os.getenv("JOB_BUDGET", "600"))  # saniye; kalan iş bir sonraki çalıştırmaya
+
+
+def archive(args):
+    import repository as repo
+    now = datetime.datetime.utcnow()
+    moved = repo.tasks.archive(now - ARCHIVE_AFTER, now, BATCH, time.monotonic() + BUDGET, PAUSE)
+    log.info("archive: %s", "budget exhausted, continuing next run" if moved == repo.PARTIAL else f"{moved} tasks moved")
+    return moved
+
+def prune_tombstones(args):
+    import repository as repo
+    from tasks import TOMBSTONE_RETENTION
+    before = datetime.datetime.utcnow() - TOMBSTONE_RETENTION
+    pruned = repo.tasks.prune_tombstones(before, BATCH * 2, time.monotonic() + BUDGET, PAUSE)
+    log.info("prune-tombstones: %s", "budget exhausted" if pruned == repo.PARTIAL else f"{pruned} removed")
+    return pruned
+
+
+def reconcile_stats(args):
+    import repository as repo
+    fixed = repo.stats.reconcile()
+    log.info("stats reconciled: %s", fixed)
+    return fixed
+
+
+JOBS = {
+    "archive": archive,
+    "prune-tombstones": prune_tombstones,
+    "reconcile-stats": reconcile_stats,
+}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Task Manager background jobs")
+    ap.add_argument("jobs", nargs="+", choices=sorted(JOBS), metavar="job")
+    args = ap.parse_args(argv)
+
+    from app import create_app
+    # repository'ler istek bağlamındaki gibi get_db() kullanır; bağlantı teardown'da havuza döner
+    with create_app().app_context():
+        for job in args.jobs:
+            JOBS[job](args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# backend/metrics.py
+# /metrics (Prometheus metin formatı): süreç içi küçük bir registry, harici bağımlılık yok.
+# gunicorn'da her worker kendi sayaçlarını tutar; METRICS_DIR verilirse worker'lar anlık
+# görüntülerini oraya yazar ve /metrics hangi worker'a düşerse düşsün hepsini toplar.
+import fcntl, glob, json, logging, os, re, threading, time
+from flask import Response, g, has_request_context, request
+
+log = logging.getLogger(__name__)
+
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "2"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))  # 0 = yavaş istek logu kapalı
+SLOW_LOG_MAX_SQL = 100
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HELP = {
+    "http_requests_total": ("counter", "HTTP responses by endpoint and status"),
+    "http_request_duration_seconds": ("histogram", "Time to produce the response (streamed bodies: first byte)"),
+    "http_request_db_statements": ("histogram", "SQL statements executed per request"),
+    "db_statement_duration_seconds": ("histogram", "SQL statement execution time"),
+    "bcrypt_duration_seconds": ("histogram", "bcrypt hash/check time including pool queueing"),
+    "bcrypt_rejected_total": ("counter", "bcrypt calls rejected with 503 (pool full / timeout)"),
+    "db_reads_total": ("counter", "Read-only checkouts by route: replica, sticky (caller wrote recently), fallback (no usable replica)"),
+    "db_replica_down_total": ("counter", "Replica taken out of rotation (connect / health check failure or lag)"),
+}
+
+
+class Registry:
+    """Counters and histograms keyed by (name, labels); labels are sorted (key, value) tuples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}  # key -> [buckets, counts per bucket, sum, count]
+
+    def inc(self, name, n=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [buckets, [0] * len(buckets), 0.0, 0]
+            for i, le in enumerate(h[0]):
+                if value <= le:
+                    h[1][i] += 1
+            h[2] += value
+            h[3] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [[n, list(map(list, l)), v] for (n, l), v in self.counters.items()],
+                "histograms": [[n, list(map(list, l)), list(h[0]), list(h[1]), h[2], h[3]]
+                               for (n, l), h in self.histograms.items()],
+            }
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+
+
+def _merge(snapshots):
+    counters, histograms = {}, {}
+    for snap in snapshots:
+        for n, l, v in snap.get("counters", ()):
+            key = (n, tuple(map(tuple, l)))
+            counters[key] = counters.get(key, 0) + v
+        for n, l, b, c, s, cnt in snap.get("histograms", ()):
+            key = (n, tuple(map(tuple, l)))
+            h = histograms.setdefault(key, [b, [0] * len(b), 0.0, 0])
+            h[1] = [x + y for x, y in zip(h[1], c)]
+            h[2] += s
+            h[3] += cnt
+    return counters, histograms
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(pairs):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+def _fmt(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+# ---------- Worker'lar arası toplama (METRICS_DIR) ----------
+_last_flush = 0.0
+
+def _path(pid):
+    return os.path.join(METRICS_DIR, f"{pid}.json")
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def _pool_gauges():
+    import models
+    return models.get_pool().stats()
+
+def flush(force=False):
+    """Write this worker's snapshot for its siblings (throttled to METRICS_FLUSH_SECONDS)."""
+    global _last_flush
+    now = time.monotonic()
+    if not METRICS_DIR or (not force and now - _last_flush < FLUSH_SECONDS):
+        return
+    _last_flush = now
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        _write(_path(os.getpid()), {**REGISTRY.snapshot(), "pool": _pool_gauges()})
+    except OSError as e:
+        log.warning("metrics flush failed: %s", e)
+
+def retire():
+    """Worker exit: fold this worker's counters into _dead.json so totals stay monotonic."""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    dead = os.path.join(METRICS_DIR, "_dead.json")
+    with open(os.path.join(METRICS_DIR, "_dead.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(dead) as f:
+                prev = json.load(f)
+        except (OSError, ValueError):
+            prev = {}
+        counters, histograms = _merge([prev, REGISTRY.snapshot()])
+        _write(dead, {
+            "counters": [[n, list(map(list, l)), v] for (n, l), v in counters.items()],
+            "histograms": [[n, list(map(list, l)), h[0], h[1], h[2], h[3]] for (n, l), h in histograms.items()],
+        })
+    try:
+        os.remove(_path(os.getpid()))
+    except OSError:
+        pass
+
+def clear_dir():
+    """Master start: drop snapshots left over from a previous run."""
+    if METRICS_DIR:
+        for p in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+            os.remove(p)
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+def _collect():
+    """-> (snapshots to sum, {pid: pool stats}) for this worker plus siblings."""
+    me = os.getpid()
+    snaps, pools = [REGISTRY.snapshot()], {me: _pool_gauges()}
+    if METRICS_DIR:
+        for p in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+            name = os.path.basename(p)[:-5]
+            if name == str(me):
+                continue
+            try:
+                with open(p) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snaps.append(data)
+            # ölü worker'ın sayaçları toplamda kalır, havuz göstergeleri kalmaz
+            if name.isdigit() and _alive(int(name)) and "pool" in data:
+                pools[int(name)] = data["pool"]
+    return snaps, pools
+
+def render() -> str:
+    snaps, pools = _collect()
+    counters, histograms = _merge(snaps)
+    out, seen = [], set()
+
+    def header(name):
+        if name not in seen:
+            seen.add(name)
+            kind, text = HELP.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {text}")
+            out.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), v in sorted(counters.items()):
+        header(name)
+        out.append(f"{name}{_labels(labels)} {_fmt(v)}")
+    for (name, labels), (buckets, counts, total, count) in sorted(histograms.items(), key=lambda kv: kv[0]):
+        header(name)
+        for le, c in zip(buckets, counts):
+            out.append(f"{name}_bucket{_labels(labels + (('le', _fmt(le)),))} {c}")
+        out.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+        out.append(f"{name}_sum{_labels(labels)} {_fmt(total)}")
+        out.append(f"{name}_count{_labels(labels)} {count}")
+    # havuz: worker başına anlık değerler (worker yeniden başlayınca sıfırlanır)
+    for stat in sorted(next(iter(pools.values()))):
+        name = f"db_pool_{stat}"
+        out.append(f"# TYPE {name} gauge")
+        for pid, stats in sorted(pools.items()):
+            out.append(f'{name}{{worker="{pid}"}} {_fmt(stats.get(stat, 0))}')
+    return "\n".join(out) + "\n"
+
+
+# ---------- İstek / SQL enstrümantasyonu ----------
+def _endpoint():
+    return request.blueprint or "app", request.endpoint or "unmatched"
+
+def record_query(sql, seconds):
+    """Called from the cursor path (models / storage) for every executed statement."""
+    if not has_request_context():
+        observe("db_statement_duration_seconds", seconds, SQL_BUCKETS, blueprint="none", endpoint="none")
+        return
+    bp, ep = _endpoint()
+    observe("db_statement_duration_seconds", seconds, SQL_BUCKETS, blueprint=bp, endpoint=ep)
+    g.db_seconds = g.get("db_seconds", 0.0) + seconds
+    if SLOW_REQUEST_MS > 0:
+        sqls = g.setdefault("db_log", [])
+        if len(sqls) < SLOW_LOG_MAX_SQL:
+            sqls.append((seconds, sql))
+
+def _compact(sql):
+    return re.sub(r"\s+", " ", sql).strip()[:500]
+
+def init_app(app):
+    @app.before_request
+    def _start_timer():
+        g.t_start = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(resp):
+        t0 = g.get("t_start")
+        if t0 is None:
+            return resp
+        elapsed = time.perf_counter() - t0
+        bp, ep = _endpoint()
+        inc("http_requests_total", blueprint=bp, endpoint=ep, method=request.method, status=str(resp.status_code))
+        observe("http_request_duration_seconds", elapsed, blueprint=bp, endpoint=ep, method=request.method)
+        observe("http_request_db_statements", g.get("db_queries", 0), COUNT_BUCKETS, blueprint=bp, endpoint=ep)
+        if SLOW_REQUEST_MS > 0 and elapsed * 1000 >= SLOW_REQUEST_MS:
+            sqls = g.get("db_log", [])
+            log.warning("slow request %s %s -> %s in %.1f ms (sql: %d stmts, %.1f ms)%s",
+                        request.method, request.full_path.rstrip("?"), resp.status_code, elapsed * 1000,
+                        g.get("db_queries", 0), g.get("db_seconds", 0.0) * 1000,
+                        "".join(f"\n  {s * 1000:8.2f} ms  {_compact(q)}" for s, q in sqls))
+        flush()
+        return resp
+
+    @app.get("/metrics")
+    def metrics():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
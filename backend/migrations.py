@@ -0,0 +1,344 @@
+# backend/migrations.py
+# Sürümlü şema göçleri: her sürüm bir kez uygulanır ve schema_migrations tablosuna yazılır.
+# Yerelde uygulama ilk DB bağlantısında migrate() çağırır (DB_AUTO_MIGRATE=1, varsayılan).
+# Üretimde kapalı: tablo yeniden kuran göçler istek içinde (gunicorn timeout'u altında) koşmasın;
+# k8s'te backend pod'unun initContainer'ı çalıştırır. Elle: python migrations.py status | up
+#
+# Yeni değişiklik = listenin sonuna yeni sürüm. Uygulanmış bir sürüm asla düzenlenmez.
+import datetime, os, sys
+from typing import NamedTuple
+
+
+class Index(NamedTuple):
+    table: str
+    name: str
+    columns: tuple
+    unique: bool = False
+
+
+MIGRATIONS = [
+    (1, "users and tasks", {
+        # MySQL'de init.sql ile gelmiş olabilir: IF NOT EXISTS
+        "mysql": [
+            """CREATE TABLE IF NOT EXISTS users (
+                 id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                 email VARCHAR(255) NOT NULL,
+                 password_hash VARCHAR(255) NOT NULL,
+                 role VARCHAR(20) NOT NULL DEFAULT 'basic',
+                 created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                 UNIQUE KEY ux_users_email (email)
+               ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+            """CREATE TABLE IF NOT EXISTS tasks (
+                 id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                 title VARCHAR(255) NOT NULL,
+                 description TEXT,
+                 status VARCHAR(20) NOT NULL DEFAULT 'todo',
+                 user_id INT NOT NULL,
+                 created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                 updated_at DATETIME NULL,
+                 CONSTRAINT fk_tasks_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+               ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+        ],
+        "sqlite": [
+            """CREATE TABLE IF NOT EXISTS users (
+                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 email VARCHAR(255) NOT NULL UNIQUE,
+                 password_hash VARCHAR(255) NOT NULL,
+                 role VARCHAR(20) NOT NULL DEFAULT 'basic',
+                 created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+               )""",
+            """CREATE TABLE IF NOT EXISTS tasks (
+                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 title VARCHAR(255) NOT NULL,
+                 description TEXT,
+                 status VARCHAR(20) NOT NULL DEFAULT 'todo',
+                 user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                 created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                 updated_at DATETIME NULL
+               )""",
+        ],
+    }),
+    # liste / filtre / login sorgularının indeksleri (init.sql'dekiler bilinmiyordu)
+    (2, "hot path indexes", {
+        "*": [
+            Index("users", "ux_users_email", ("email",), unique=True),
+            Index("tasks", "ix_tasks_user_created", ("user_id", "created_at", "id")),
+            Index("tasks", "ix_tasks_created", ("created_at", "id")),
+            Index("tasks", "ix_tasks_user_status_created", ("user_id", "status", "created_at", "id")),
+            Index("tasks", "ix_tasks_status_created", ("status", "created_at", "id")),
+        ],
+    }),
+    # kullanıcı başına görev listesi sürümü (scope 0 = tüm görevler / admin): ETag ve cache anahtarı
+    (3, "task list versions", {
+        "mysql": ["""CREATE TABLE IF NOT EXISTS task_versions (
+                       scope INT NOT NULL PRIMARY KEY,
+                       version BIGINT NOT NULL DEFAULT 0
+                     )"""],
+        "sqlite": ["""CREATE TABLE IF NOT EXISTS task_versions (
+                        scope INTEGER PRIMARY KEY,
+                        version INTEGER NOT NULL DEFAULT 0
+                      )"""],
+    }),
+    # değişiklik akışı: mikrosaniye hassasiyetli updated_at + indeksler + tombstone tablosu
+    (4, "change feed", {
+        "mysql": [
+            "ALTER TABLE tasks MODIFY updated_at DATETIME(6) NULL",
+            """CREATE TABLE IF NOT EXISTS task_tombstones (
+                 task_id INT NOT NULL PRIMARY KEY,
+                 user_id INT NOT NULL,
+                 deleted_at DATETIME(6) NOT NULL
+               )""",
+        ],
+        "sqlite": [
+            """CREATE TABLE IF NOT EXISTS task_tombstones (
+                 task_id INTEGER PRIMARY KEY,
+                 user_id INTEGER NOT NULL,
+                 deleted_at DATETIME NOT NULL
+               )""",
+        ],
+        "*": [
+            # eski satırlar akışta görünsün (updated_at artık oluşturmada da yazılıyor)
+            "UPDATE tasks SET updated_at=created_at WHERE updated_at IS NULL",
+            Index("tasks", "ix_tasks_user_updated", ("user_id", "updated_at", "id")),
+            Index("tasks", "ix_tasks_updated", ("updated_at", "id")),
+            Index("task_tombstones", "ix_tombstones_user_deleted", ("user_id", "deleted_at", "task_id")),
+            Index("task_tombstones", "ix_tombstones_deleted", ("deleted_at", "task_id")),
+        ],
+    }),
+    # /api/tasks/search: MySQL FULLTEXT (InnoDB kendisi günceller), SQLite FTS5 + tetikleyiciler
+    (5, "task search", {
+        "mysql": ["ALTER TABLE tasks ADD FULLTEXT INDEX ft_tasks_text (title, description)"],
+        "sqlite": [
+            """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts
+                 USING fts5(title, description, content='tasks', content_rowid='id')""",
+            """CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+                 INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+               END""",
+            """CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+                 INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+                 VALUES ('delete', old.id, old.title, old.description);
+               END""",
+            """CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+                 INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+                 VALUES ('delete', old.id, old.title, old.description);
+                 INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+               END""",
+            # mevcut satırlar
+            "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+        ],
+    }),
+    # /api/tasks/stats: sahip x durum ve sahip x oluşturma günü sayaçları; tasks üzerindeki
+    # tetikleyiciler yazmayla aynı transaction'da günceller (uzlaştırma: jobs.py reconcile-stats)
+    (6, "task stats counters", {
+        "mysql": [
+            """CREATE TABLE IF NOT EXISTS task_counts (
+                 user_id INT NOT NULL,
+                 status VARCHAR(20) NOT NULL,
+                 n BIGINT NOT NULL DEFAULT 0,
+                 PRIMARY KEY (user_id, status)
+               )""",
+            """CREATE TABLE IF NOT EXISTS task_daily (
+                 user_id INT NOT NULL,
+                 day DATE NOT NULL,
+                 n BIGINT NOT NULL DEFAULT 0,
+                 PRIMARY KEY (user_id, day)
+               )""",
+            """CREATE TRIGGER tasks_stats_ai AFTER INSERT ON tasks FOR EACH ROW BEGIN
+                 INSERT INTO task_counts(user_id, status, n) VALUES (NEW.user_id, NEW.status, 1)
+                   ON DUPLICATE KEY UPDATE n=n+1;
+                 INSERT INTO task_daily(user_id, day, n) VALUES (NEW.user_id, DATE(NEW.created_at), 1)
+                   ON DUPLICATE KEY UPDATE n=n+1;
+               END""",
+            # not: MySQL'de FK cascade tetikleyici çalıştırmaz -> kullanıcı silmede sayaçlar elle silinir
+            """CREATE TRIGGER tasks_stats_ad AFTER DELETE ON tasks FOR EACH ROW BEGIN
+                 UPDATE task_counts SET n=n-1 WHERE user_id=OLD.user_id AND status=OLD.status;
+                 UPDATE task_daily SET n=n-1 WHERE user_id=OLD.user_id AND day=DATE(OLD.created_at);
+               END""",
+            """CREATE TRIGGER tasks_stats_au AFTER UPDATE ON tasks FOR EACH ROW BEGIN
+                 IF NEW.status <> OLD.status OR NEW.user_id <> OLD.user_id THEN
+                   UPDATE task_counts SET n=n-1 WHERE user_id=OLD.user_id AND status=OLD.status;
+                   INSERT INTO task_counts(user_id, status, n) VALUES (NEW.user_id, NEW.status, 1)
+                     ON DUPLICATE KEY UPDATE n=n+1;
+                 END IF;
+               END""",
+        ],
+        "sqlite": [
+            """CREATE TABLE IF NOT EXISTS task_counts (
+                 user_id INTEGER NOT NULL,
+                 status VARCHAR(20) NOT NULL,
+                 n INTEGER NOT NULL DEFAULT 0,
+                 PRIMARY KEY (user_id, status)
+               )""",
+            """CREATE TABLE IF NOT EXISTS task_daily (
+                 user_id INTEGER NOT NULL,
+                 day DATE NOT NULL,
+                 n INTEGER NOT NULL DEFAULT 0,
+                 PRIMARY KEY (user_id, day)
+               )""",
+            """CREATE TRIGGER IF NOT EXISTS tasks_stats_ai AFTER INSERT ON tasks BEGIN
+                 INSERT INTO task_counts(user_id, status, n) VALUES (new.user_id, new.status, 1)
+                   ON CONFLICT(user_id, status) DO UPDATE SET n=n+1;
+                 INSERT INTO task_daily(user_id, day, n) VALUES (new.user_id, date(new.created_at), 1)
+                   ON CONFLICT(user_id, day) DO UPDATE SET n=n+1;
+               END""",
+            """CREATE TRIGGER IF NOT EXISTS tasks_stats_ad AFTER DELETE ON tasks BEGIN
+                 UPDATE task_counts SET n=n-1 WHERE user_id=old.user_id AND status=old.status;
+                 UPDATE task_daily SET n=n-1 WHERE user_id=old.user_id AND day=date(old.created_at);
+               END""",
+            """CREATE TRIGGER IF NOT EXISTS tasks_stats_au AFTER UPDATE OF status, user_id ON tasks
+                 WHEN new.status IS NOT old.status OR new.user_id IS NOT old.user_id BEGIN
+                 UPDATE task_counts SET n=n-1 WHERE user_id=old.user_id AND status=old.status;
+                 INSERT INTO task_counts(user_id, status, n) VALUES (new.user_id, new.status, 1)
+                   ON CONFLICT(user_id, status) DO UPDATE SET n=n+1;
+               END""",
+        ],
+        "*": [
+            Index("task_daily", "ix_task_daily_day", ("day", "user_id")),
+            # mevcut görevler (tetikleyicilerden önce sayılmış olanlar dahil baştan)
+            "DELETE FROM task_counts",
+            "INSERT INTO task_counts(user_id, status, n) SELECT user_id, status, COUNT(*) FROM tasks GROUP BY user_id, status",
+            "DELETE FROM task_daily",
+            "INSERT INTO task_daily(user_id, day, n) SELECT user_id, DATE(created_at), COUNT(*) FROM tasks GROUP BY user_id, DATE(created_at)",
+        ],
+    }),
+    # sıcak/soğuk ayrımı: eski 'done' görevler jobs.py archive ile buraya taşınır
+    (7, "task archive", {
+        "mysql": [
+            """CREATE TABLE IF NOT EXISTS tasks_archive (
+                 id INT NOT NULL PRIMARY KEY,
+                 title VARCHAR(255) NOT NULL,
+                 description TEXT,
+                 status VARCHAR(20) NOT NULL,
+                 user_id INT NOT NULL,
+                 created_at DATETIME NOT NULL,
+                 updated_at DATETIME(6) NULL,
+                 archived_at DATETIME(6) NOT NULL
+               ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4""",
+        ],
+        "sqlite": [
+            """CREATE TABLE IF NOT EXISTS tasks_archive (
+                 id INTEGER PRIMARY KEY,
+                 title VARCHAR(255) NOT NULL,
+                 description TEXT,
+                 status VARCHAR(20) NOT NULL,
+                 user_id INTEGER NOT NULL,
+                 created_at DATETIME NOT NULL,
+                 updated_at DATETIME NULL,
+                 archived_at DATETIME NOT NULL
+               )""",
+        ],
+        "*": [
+            Index("tasks_archive", "ix_archive_user_created", ("user_id", "created_at", "id")),
+            Index("tasks_archive", "ix_archive_created", ("created_at", "id")),
+            # arşivleyicinin aday taraması
+            Index("tasks", "ix_tasks_status_updated", ("status", "updated_at", "id")),
+        ],
+    }),
+]
+
+# yarım kalmış bir önceki çalıştırma / init.sql: "zaten var" hataları yok sayılır
+_MYSQL_ALREADY_EXISTS = (1050, 1060, 1061, 1359)
+
+
+def _steps(spec, dialect):
+    return spec.get(dialect, []) + spec.get("*", [])
+
+def _mysql_has_index(c, ix: Index) -> bool:
+    # aynı sütunlarla başlayan bir indeks varsa (ör. init.sql'den, farklı adla) yenisi gereksiz
+    c.execute("""SELECT index_name, non_unique, column_name FROM information_schema.statistics
+                 WHERE table_schema=DATABASE() AND table_name=%s ORDER BY index_name, seq_in_index""",
+              (ix.table,))
+    existing = {}
+    for r in c.fetchall():
+        r = {k.lower(): v for k, v in r.items()}
+        existing.setdefault(r["index_name"], [not r["non_unique"], []])[1].append(r["column_name"].lower())
+    return any(cols[:len(ix.columns)] == list(ix.columns) and (unique or not ix.unique)
+               for unique, cols in existing.values())
+
+def _apply(c, dialect, step):
+    if isinstance(step, Index):
+        unique = "UNIQUE " if step.unique else ""
+        cols = ", ".join(step.columns)
+        if dialect == "sqlite":
+            c.execute(f"CREATE {unique}INDEX IF NOT EXISTS {step.name} ON {step.table}({cols})")
+            return
+        if _mysql_has_index(c, step):
+            return
+        step = f"CREATE {unique}INDEX {step.name} ON {step.table}({cols})"
+    if dialect == "sqlite":
+        c.execute(step)
+        return
+    import pymysql
+    try:
+        c.execute(step)
+    except pymysql.err.OperationalError as e:
+        if e.args[0] not in _MYSQL_ALREADY_EXISTS:
+            raise
+
+def _applied(c):
+    c.execute("""CREATE TABLE IF NOT EXISTS schema_migrations (
+                   version INT NOT NULL PRIMARY KEY,
+                   name VARCHAR(100) NOT NULL,
+                   applied_at DATETIME NOT NULL
+                 )""")
+    c.execute("SELECT version FROM schema_migrations")
+    return {r["version"] for r in c.fetchall()}
+
+def _run_pending(c, dialect):
+    applied, done = _applied(c), []
+    for version, name, spec in MIGRATIONS:
+        if version in applied:
+            continue
+        for step in _steps(spec, dialect):
+            _apply(c, dialect, step)
+        c.execute("INSERT INTO schema_migrations(version,name,applied_at) VALUES(%s,%s,%s)",
+                  (version, name, datetime.datetime.utcnow()))
+        done.append(version)
+    return done
+
+def migrate(conn, dialect) -> list:
+    """Apply pending migrations on a raw connection; returns the versions applied.
+
+    Concurrent callers (gunicorn workers, several pods) serialize on a lock:
+    SQLite BEGIN IMMEDIATE (DDL is transactional there), MySQL GET_LOCK
+    (DDL auto-commits, so each step tolerates "already exists").
+    """
+    if dialect == "sqlite":
+        conn.begin()
+        try:
+            with conn.cursor() as c:
+                done = _run_pending(c, dialect)
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        return done
+
+    with conn.cursor() as c:
+        c.execute("SELECT GET_LOCK('schema_migrations', 300) AS ok")
+        if not c.fetchone()["ok"]:
+            raise RuntimeError("could not acquire the schema migration lock")
+        try:
+            return _run_pending(c, dialect)
+        finally:
+            c.execute("DO RELEASE_LOCK('schema_migrations')")
+
+def status(conn):
+    with conn.cursor() as c:
+        applied = _applied(c)
+    return [(version, name, version in applied) for version, name, _ in MIGRATIONS]
+
+
+if __name__ == "__main__":
+    os.environ["DB_AUTO_MIGRATE"] = "0"
+    import models
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "up"
+    with models.pooled_connection() as conn:
+        if cmd == "status":
+            for version, name, ok in status(conn):
+                print(f"{version:>4}  {'applied' if ok else 'pending':<8} {name}")
+        elif cmd == "up":
+            applied = migrate(conn, models.DB_BACKEND)
+            print(f"applied: {applied}" if applied else "schema is up to date")
+        else:
+            sys.exit("usage: python migrations.py [status|up]")
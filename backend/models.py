@@ -1,28 +1,280 @@
-import os, bcrypt, pymysql
+import functools, math, os, threading, time, pymysql
+from contextlib import contextmanager
+from flask import g, has_app_context, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
 from dotenv import load_dotenv
+from cache import TTLCache
+from pool import ConnectionPool
+import metrics
 load_dotenv()
 
-def get_db():
+# mysql (varsayılan) | sqlite: MySQL'siz yerel koşum / test / benchmark
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+
+# Okuma replikaları: "host[:port],..." (MySQL; kullanıcı / parola / DB birincille aynı).
+# sqlite'ta dosya yolları; SQLITE_PATH ile aynı yol verilirse yerelde aynı stand-in denenir.
+REPLICA_HOSTS = [h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(",") if h.strip()]
+# kendi yazdığını görsün: kullanıcı yazdıktan sonra okumaları bu süre boyunca birincilde
+STICKY_SECONDS = float(os.getenv("DB_STICKY_SECONDS", "5"))
+STICKY_COOKIE = "db_primary"
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_replicas = None
+_replicas_pid = None
+_sticky = TTLCache(int(os.getenv("DB_STICKY_USERS", "10000")), STICKY_SECONDS)  # worker içi: kimlik -> True
+_schema_ready = False
+_captured = None  # capture_queries() açıkken: [(sql, params)]
+
+def record_query(sql, seconds=0.0, params=None):
+    # istek başına SQL sayısı (X-DB-Queries, benchmark) + süre (/metrics, yavaş istek logu)
+    if has_app_context():
+        g.db_queries = g.get("db_queries", 0) + 1
+    metrics.record_query(sql, seconds)
+    if _captured is not None:
+        _captured.append((sql, params))
+
+@contextmanager
+def capture_queries():
+    """Collect every executed statement with its parameters (plancheck.py)."""
+    global _captured
+    _captured = []
+    try:
+        yield _captured
+    finally:
+        _captured = None
+
+class DictCursor(pymysql.cursors.DictCursor):
+    def execute(self, query, args=None):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            record_query(query, time.perf_counter() - t0, args)
+
+class SSDictCursor(pymysql.cursors.SSDictCursor):
+    def execute(self, query, args=None):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            record_query(query, time.perf_counter() - t0, args)
+
+def _connect():
+    global _schema_ready
+    if DB_BACKEND == "sqlite":
+        from storage import connect_sqlite
+        conn = connect_sqlite()
+    else:
+        conn = _connect_mysql()
+    if not _schema_ready and os.getenv("DB_AUTO_MIGRATE", "1") == "1":
+        # bekleyen şema göçleri: process başına bir kez (migrations.py)
+        from migrations import migrate
+        try:
+            migrate(conn, DB_BACKEND)
+        except Exception:
+            conn.close()
+            raise
+        _schema_ready = True
+    return conn
+
+def _connect_replica(host):
+    if DB_BACKEND == "sqlite":
+        from storage import connect_sqlite
+        return connect_sqlite(host, read_only=True)
+    name, _, port = host.partition(":")
+    # replikaya yanlışlıkla yönlenen yazma sessizce gitmesin, hata versin
+    return _connect_mysql(name, int(port or os.getenv("DB_PORT","3306")),
+                          init_command="SET SESSION TRANSACTION READ ONLY")
+
+def _connect_mysql(host=None, port=None, init_command=None):
     return pymysql.connect(
-        host=os.getenv("DB_HOST","127.0.0.1"),
-        port=int(os.getenv("DB_PORT","3306")),
+        host=host or os.getenv("DB_HOST","127.0.0.1"),
+        port=port or int(os.getenv("DB_PORT","3306")),
         user=os.getenv("DB_USER","root"),
         password=os.getenv("DB_PASS","changeme"),
         database=os.getenv("DB_NAME","taskdb"),
-        cursorclass=pymysql.cursors.DictCursor,
+        cursorclass=DictCursor,
+        # rowcount = eşleşen satır (değişen değil): koşullu UPDATE'lerde 404/403 ayrımı için
+        client_flag=pymysql.constants.CLIENT.FOUND_ROWS,
+        init_command=init_command,
         autocommit=True
     )
 
-def create_user(email: str, password: str, role: str = "basic"):
-    pw_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-    with get_db().cursor() as c:
-        c.execute("INSERT INTO users(email,password_hash,role) VALUES(%s,%s,%s)",
-                  (email, pw_hash, role))
+def _new_pool(connect, size, timeout):
+    return ConnectionPool(
+        connect,
+        size=size,
+        timeout=timeout,
+        recycle=float(os.getenv("DB_POOL_RECYCLE","1800")),
+        ping_idle=float(os.getenv("DB_POOL_PING_IDLE","5")),
+    )
+
+def get_pool() -> ConnectionPool:
+    # Process başına bir havuz: fork sonrası (pid değişince) yeniden kurulur
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = _new_pool(_connect, int(os.getenv("DB_POOL_SIZE","5")),
+                                  float(os.getenv("DB_POOL_TIMEOUT","5")))
+                _pool_pid = os.getpid()
+    return _pool
+
+def get_replicas():
+    """Per-process ReplicaSet for DB_REPLICA_HOSTS, or None when no replica is configured."""
+    global _replicas, _replicas_pid
+    if not REPLICA_HOSTS:
+        return None
+    if _replicas is None or _replicas_pid != os.getpid():
+        with _pool_lock:
+            if _replicas is None or _replicas_pid != os.getpid():
+                from replicas import Replica, ReplicaSet, mysql_lag, ping_lag
+                size = int(os.getenv("DB_REPLICA_POOL_SIZE", os.getenv("DB_POOL_SIZE","5")))
+                # kısa bekleme: replika havuzu doluysa okuma birincile düşer
+                timeout = float(os.getenv("DB_REPLICA_POOL_TIMEOUT","1"))
+                _replicas = ReplicaSet(
+                    [Replica(h, _new_pool(functools.partial(_connect_replica, h), size, timeout))
+                     for h in REPLICA_HOSTS],
+                    ping_lag if DB_BACKEND == "sqlite" else mysql_lag,
+                    check_every=float(os.getenv("DB_REPLICA_CHECK_SECONDS","5")),
+                    retry=float(os.getenv("DB_REPLICA_RETRY_SECONDS","10")),
+                    # yapışkan pencereden fazla geciken replika kendi yazdığını göstermeyebilir
+                    max_lag=float(os.getenv("DB_REPLICA_MAX_LAG", str(STICKY_SECONDS))),
+                )
+                _replicas_pid = os.getpid()
+    return _replicas
+
+def reset_pool():
+    """Drop the inherited pools after fork; the next get_pool() builds a fresh one."""
+    global _pool, _pool_pid, _replicas, _replicas_pid
+    with _pool_lock:
+        _pool, _pool_pid = None, None
+        _replicas, _replicas_pid = None, None
+
+def close_pools():
+    get_pool().close()
+    if get_replicas():
+        get_replicas().close()
+
+# ---------- Okuma yönlendirme ----------
+def _identity():
+    try:
+        return get_jwt_identity() or None
+    except RuntimeError:  # jwt_required olmayan uç nokta
+        return None
+
+def _is_sticky():
+    if STICKY_SECONDS <= 0 or not has_request_context():
+        return False
+    who = _identity()
+    if who is None:
+        return False
+    if _sticky.get(who):
+        return True
+    # diğer worker / pod'lardaki yazmalar: çerez "kimlik:bitiş" (yalnızca aynı kimlik için geçerli)
+    uid, _, until = request.cookies.get(STICKY_COOKIE, "").partition(":")
+    try:
+        return uid == who and time.time() < float(until) <= time.time() + STICKY_SECONDS
+    except ValueError:
+        return False
+
+def _read_replica():
+    """-> (replica, conn) for a read-only checkout, or None when it must use the primary."""
+    replicas = get_replicas()
+    if replicas is None:
+        return None
+    if _is_sticky():
+        metrics.inc("db_reads_total", route="sticky")
+        return None
+    replica, conn = replicas.acquire()
+    if conn is None:
+        metrics.inc("db_reads_total", route="fallback")
+        return None
+    metrics.inc("db_reads_total", route="replica")
+    return replica, conn
+
+def get_db(readonly=False):
+    """Request-scoped connection; returned to the pool in teardown.
+
+    readonly=True may return a replica connection: only when replicas are configured,
+    the caller has not written within DB_STICKY_SECONDS, and this request has not
+    already opened the primary connection. Otherwise it is the primary one."""
+    if readonly and "db" not in g:
+        if "db_ro" not in g:
+            g.db_ro = _read_replica()
+        if g.db_ro is not None:
+            return g.db_ro[1]
+    if "db" not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+def reading_replica() -> bool:
+    """True when get_db(readonly=True) is served by a replica in this request."""
+    return g.get("db_ro") is not None and "db" not in g
+
+def release_db(exc=None):
+    conn = g.pop("db", None)
+    if conn is not None:
+        # hata ile biten isteğin bağlantısı yarım transaction taşıyabilir -> at
+        get_pool().release(conn, discard=exc is not None)
+    ro = g.pop("db_ro", None)
+    if ro is not None:
+        get_replicas().release(*ro, discard=exc is not None)
+
+def checkout(readonly=False):
+    """Connection outside the request one (streamed exports) -> (conn, release(conn, discard))."""
+    ro = _read_replica() if readonly else None
+    if ro is not None:
+        replica, conn = ro
+        return conn, replica.pool.release
+    pool = get_pool()
+    return pool.acquire(), pool.release
+
+@contextmanager
+def pooled_connection():
+    """Checkout outside a request (scripts, background jobs)."""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    except Exception:
+        pool.release(conn, discard=True)
+        raise
+    pool.release(conn)
+
+@contextmanager
+def transaction():
+    """Cursor on the request connection inside BEGIN ... COMMIT (ROLLBACK on error)."""
+    conn = get_db()
+    conn.begin()
+    try:
+        with conn.cursor() as c:
+            yield c
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
+def init_app(app):
+    app.teardown_appcontext(release_db)
 
-def get_user_by_email(email: str):
-    with get_db().cursor() as c:
-        c.execute("SELECT id,email,password_hash,role,created_at FROM users WHERE email=%s",(email,))
-        return c.fetchone()
+    if REPLICA_HOSTS and STICKY_SECONDS > 0:
+        @app.after_request
+        def _stick_to_primary(resp):
+            # başarılı yazma isteği: bu kullanıcının okumaları bir süre birincilde
+            if request.method in ("GET", "HEAD", "OPTIONS") or resp.status_code >= 400:
+                return resp
+            who = _identity()
+            if who is not None:
+                _sticky.set(who, True)
+                resp.set_cookie(STICKY_COOKIE, f"{who}:{time.time() + STICKY_SECONDS:.3f}",
+                                max_age=math.ceil(STICKY_SECONDS), httponly=True, samesite="Lax")
+            return resp
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    if os.getenv("DB_QUERY_HEADER", "0") == "1":
+        @app.after_request
+        def _query_count_header(resp):
+            resp.headers["X-DB-Queries"] = str(g.get("db_queries", 0))
+            return resp
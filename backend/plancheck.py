@@ -0,0 +1,157 @@
+# backend/plancheck.py
+# Sorgu planı regresyon kontrolü: blueprint'lerin her rotası çağrılır, çalışan her sorgu
+# için EXPLAIN alınır; tam tablo taraması veya filesort görülürse çıkış kodu 1.
+#
+#   DB_BACKEND=sqlite SQLITE_PATH=:memory: python plancheck.py    # CI
+#   python plancheck.py --tasks 50000 -v                          # MySQL (.env ayarlarıyla)
+import argparse, os, re, sys
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("BCRYPT_WORKERS", "0")
+os.environ.setdefault("LOGIN_MAX_PER_IP", "1000000000")
+os.environ.setdefault("LOGIN_MAX_PER_EMAIL", "1000000000")
+
+# Bilerek izin verilen planlar: uç nokta -> (izinli sorun türleri, neden)
+ALLOW = {
+    "tasks.export_tasks": ({"scan", "filesort"}, "export streams every row"),
+    "users.export_users": ({"scan", "filesort"}, "export streams every row"),
+    "users.list_users": ({"scan", "filesort"}, "admin list returns every user"),
+    "tasks.search_tasks": ({"filesort"}, "relevance order sorts the matched rows"),
+    # admin toplamları kullanıcı x durum sayaçları üzerinden: O(kullanıcı), O(görev) değil
+    "tasks.task_stats": ({"scan", "filesort"}, "admin totals aggregate the per-user counters"),
+}
+
+_EXPLAINABLE = re.compile(r"\s*(SELECT|UPDATE|DELETE)\b|\s*INSERT\b.*\bSELECT\b", re.I | re.S)
+
+
+def exercise(client, n_users):
+    """Call every blueprint route; -> [(endpoint, method, path, status, [(sql, params)])]."""
+    from bench import ADMIN_EMAIL, PASSWORD, _email
+    from models import capture_queries
+
+    def login(email):
+        r = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        return {"Authorization": "Bearer " + r.get_json()["access_token"]}
+    admin, basic, victim = login(ADMIN_EMAIL), login(_email(0)), _email(n_users - 1)
+    results = []
+
+    with capture_queries() as captured:
+        def call(endpoint, method, path, headers=None, json=None):
+            start = len(captured)
+            r = client.open(path, method=method, headers=headers or {}, json=json)
+            r.get_data()  # akış yanıtları (export) burada tüketilir
+            results.append((endpoint, method, path, r.status_code, captured[start:]))
+            return r.get_json(silent=True) or {}
+
+        call("auth.register", "POST", "/api/auth/register",
+             json={"email": "plancheck@example.com", "password": PASSWORD})
+        call("auth.login", "POST", "/api/auth/login", json={"email": _email(1), "password": PASSWORD})
+
+        for who, h in (("basic", basic), ("admin", admin)):
+            lists = ["limit=20", "status=done", "status=todo,done", "fields=title,owner_email",
+                     "created_from=2000-01-01&created_to=2100-01-01"]
+            if who == "admin":
+                lists += [f"owner={_email(2)}", "owner=3", f"owner={_email(2)}&status=done"]
+            for q in lists:
+                cursor = call("tasks.list_tasks", "GET", f"/api/tasks?{q}", h).get("next_cursor")
+                if cursor:
+                    call("tasks.list_tasks", "GET", f"/api/tasks?{q}&cursor={cursor}", h)
+            token = call("tasks.task_changes", "GET", "/api/tasks/changes?limit=50", h).get("next")
+            call("tasks.task_changes", "GET", f"/api/tasks/changes?since={token}", h)
+            call("tasks.export_tasks", "GET", "/api/tasks/export", h)
+            call("tasks.task_stats", "GET", "/api/tasks/stats", h)
+            cursor = call("tasks.archived_tasks", "GET", "/api/tasks/archive?limit=5", h).get("next_cursor")
+            call("tasks.archived_tasks", "GET", f"/api/tasks/archive?limit=5&cursor={cursor}", h)
+            cursor = call("tasks.search_tasks", "GET", "/api/tasks/search?q=task&limit=5", h).get("next_cursor")
+            call("tasks.search_tasks", "GET", f"/api/tasks/search?q=task&limit=5&cursor={cursor}", h)
+
+            tid = call("tasks.create_task", "POST", "/api/tasks", h, {"title": "plan"})["id"]
+            call("tasks.update_task", "PATCH", f"/api/tasks/{tid}", h, {"status": "done"})
+            call("tasks.toggle_task", "PUT", f"/api/tasks/{tid}/toggle", h)
+            call("tasks.delete_task", "DELETE", f"/api/tasks/{tid}", h)
+            res = call("tasks.bulk_create", "POST", "/api/tasks/bulk", h, {"items": [{"title": "a"}, {"title": "b"}]})
+            ids = [r["id"] for r in res["results"]]
+            call("tasks.bulk_update", "PATCH", "/api/tasks/bulk", h, {"items": [{"id": i, "status": "done"} for i in ids]})
+            call("tasks.bulk_delete", "DELETE", "/api/tasks/bulk", h, {"ids": ids})
+
+        users = call("users.list_users", "GET", "/api/users", admin)["items"]
+        call("users.export_users", "GET", "/api/users/export", admin)
+        uid = next(u["id"] for u in users if u["email"] == victim)
+        call("users.delete_user", "DELETE", f"/api/users/{uid}", admin)
+    return results
+
+
+def explain(conn, backend, sql, params):
+    """-> (problems as [(kind, text)], plan lines) for one statement."""
+    problems, lines = [], []
+    with conn.cursor() as c:
+        if backend == "sqlite":
+            c.execute("EXPLAIN QUERY PLAN " + sql, params or ())
+            for r in c.fetchall():
+                d = r["detail"]
+                lines.append(d)
+                m = re.match(r"SCAN (\w+)", d)
+                # VIRTUAL TABLE: FTS5 MATCH kendi indeksini kullanır
+                if m and not re.search(r"USING|CONSTANT ROW|VIRTUAL TABLE", d):
+                    problems.append(("scan", f"full scan of {m.group(1)}"))
+                if "TEMP B-TREE" in d:
+                    problems.append(("filesort", d))
+        else:
+            c.execute("EXPLAIN " + sql, params or ())
+            for r in c.fetchall():
+                extra = r.get("Extra") or ""
+                lines.append(f"{r.get('table')}: type={r.get('type')} key={r.get('key')} rows={r.get('rows')} {extra}")
+                if r.get("type") == "ALL":
+                    problems.append(("scan", f"full scan of {r.get('table')}"))
+                if "filesort" in extra:
+                    problems.append(("filesort", f"filesort on {r.get('table')}"))
+    return problems, lines
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="EXPLAIN every query the API issues")
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--tasks", type=int, default=5000)
+    ap.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = ap.parse_args(argv)
+
+    import bench, jobs, models
+    from app import create_app
+    bench.seed(args.users, args.tasks)
+    jobs.main(["archive"])  # arşiv uç noktası boş tabloya bakmasın
+    with models.pooled_connection() as conn:
+        with conn.cursor() as c:
+            # istatistikler güncel olsun: planlayıcı küçük tablolarda taramayı seçmesin
+            c.execute("ANALYZE" if models.DB_BACKEND == "sqlite" else "ANALYZE TABLE users, tasks, task_tombstones")
+            if models.DB_BACKEND != "sqlite":
+                c.fetchall()
+
+    client = create_app().test_client()
+    failures, seen = 0, set()
+    with models.pooled_connection() as conn:
+        for endpoint, method, path, status, queries in exercise(client, args.users):
+            if status >= 400:
+                failures += 1
+                print(f"FAIL  {method} {path} -> {status}")
+            for sql, params in queries:
+                if not _EXPLAINABLE.match(sql) or (endpoint, sql) in seen:
+                    continue
+                seen.add((endpoint, sql))
+                problems, lines = explain(conn, models.DB_BACKEND, sql, params)
+                flat = re.sub(r"\s+", " ", sql).strip()
+                allowed, reason = ALLOW.get(endpoint, (set(), ""))
+                bad = [text for kind, text in problems if kind not in allowed]
+                if bad:
+                    verdict = "FAIL  " + "; ".join(bad)
+                    failures += 1
+                else:
+                    verdict = f"allow ({reason})" if problems else "ok"
+                if args.verbose or verdict.startswith("FAIL"):
+                    print(f"{verdict:<6} {endpoint}: {flat[:160]}")
+                    for line in lines:
+                        print(f"         {line}")
+    print(f"{len(seen)} distinct statements checked, {failures} problem(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# backend/pool.py
+import collections, threading, time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection frees up within the pool timeout."""
+
+
+def _alive(conn) -> bool:
+    try:
+        conn.ping(reconnect=False)
+        return True
+    except Exception:
+        return False
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB connections.
+
+    - at most `size` connections exist (idle + in use)
+    - idle connections older than `recycle` seconds are replaced on checkout
+    - connections idle for more than `ping_idle` seconds are pinged before reuse
+    """
+
+    def __init__(self, connect, size=5, timeout=5.0, recycle=1800.0, ping_idle=5.0):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_idle = ping_idle
+        self._idle = collections.deque()  # (conn, born, released_at)
+        self._born = {}                   # id(conn) -> born, checked-out connections
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._counts = collections.Counter()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            while not self._idle and self._in_use >= self.size:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    self._counts["timeouts"] += 1
+                    raise PoolTimeout(f"no free DB connection after {self.timeout}s (size={self.size})")
+                self._cond.wait(left)
+            # LIFO: en son bırakılan (en sıcak) bağlantı önce
+            item = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            waited = time.monotonic() - start
+            self._counts["checkouts"] += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        try:
+            return self._checkout(item)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _checkout(self, item):
+        now = time.monotonic()
+        if item is not None:
+            conn, born, released = item
+            if now - born > self.recycle:
+                self._bump("recycled")
+                _close(conn)
+            elif now - released > self.ping_idle and not _alive(conn):
+                self._bump("stale")
+                _close(conn)
+            else:
+                with self._cond:
+                    self._born[id(conn)] = born
+                return conn
+        conn = self._connect()
+        self._bump("created")
+        with self._cond:
+            self._born[id(conn)] = now
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            born = self._born.pop(id(conn), None)
+            if born is None:
+                return  # not ours / already released
+            if discard or not getattr(conn, "open", True):
+                self._counts["discarded"] += 1
+                _close(conn)
+            else:
+                self._idle.append((conn, born, time.monotonic()))
+            self._in_use -= 1
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), collections.deque()
+        for conn, _, _ in idle:
+            _close(conn)
+
+    def _bump(self, key):
+        with self._cond:
+            self._counts[key] += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            checkouts = self._counts["checkouts"]
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "created": self._counts["created"],
+                "recycled": self._counts["recycled"],
+                "stale": self._counts["stale"],
+                "discarded": self._counts["discarded"],
+                "timeouts": self._counts["timeouts"],
+                "wait_ms_avg": round(1000 * self._wait_total / checkouts, 3) if checkouts else 0.0,
+                "wait_ms_max": round(1000 * self._wait_max, 3),
+            }
@@ -0,0 +1,110 @@
+# backend/replicas.py
+# Okuma replikaları: her replika kendi havuzuyla; sağlık kontrolü ve geri düşme burada,
+# yönlendirme kararı (yapışkan birincil vb.) models.get_db(readonly=True) içinde.
+import logging, threading, time
+import metrics
+from pool import PoolTimeout
+
+log = logging.getLogger(__name__)
+
+LAG_UNKNOWN = float("inf")  # replikasyon durmuş / okunamadı
+
+
+def mysql_lag(conn):
+    """Seconds behind the source; 0 for a server that is not a replica (e.g. a second local instance)."""
+    with conn.cursor() as c:
+        try:
+            c.execute("SHOW REPLICA STATUS")  # MySQL 8.0.22+
+        except Exception:
+            c.execute("SHOW SLAVE STATUS")
+        r = c.fetchone()
+    if not r:
+        return 0.0
+    lag = r.get("Seconds_Behind_Source", r.get("Seconds_Behind_Master"))
+    return LAG_UNKNOWN if lag is None else float(lag)
+
+
+def ping_lag(conn):
+    # SQLite stand-in: aynı dosya, gecikme yok; yalnızca bağlantı canlı mı
+    conn.ping(reconnect=False)
+    return 0.0
+
+
+class Replica:
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.lag = None
+        self.failures = 0
+
+
+class ReplicaSet:
+    """Round-robin over healthy replicas.
+
+    - every `check_every` seconds the next checkout also measures replication lag
+    - a replica that cannot connect or lags more than `max_lag` seconds is skipped
+      for `retry` seconds; callers fall back to the primary when none is usable
+    """
+
+    def __init__(self, replicas, lag, check_every=5.0, retry=10.0, max_lag=5.0):
+        self.replicas = replicas
+        self._lag = lag
+        self.check_every = check_every
+        self.retry = retry
+        self.max_lag = max_lag
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _order(self):
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def _down(self, replica, why):
+        replica.down_until = time.monotonic() + self.retry
+        replica.failures += 1
+        metrics.inc("db_replica_down_total", replica=replica.name)
+        log.warning("replica %s unavailable for %.0fs: %s", replica.name, self.retry, why)
+
+    def acquire(self):
+        """-> (replica, connection) from the first usable replica, or (None, None)."""
+        for replica in self._order():
+            now = time.monotonic()
+            if replica.down_until > now:
+                continue
+            try:
+                conn = replica.pool.acquire()
+            except PoolTimeout:
+                continue  # dolu ama sağlıklı: bu istek başka yere
+            except Exception as e:
+                self._down(replica, e)
+                continue
+            if now - replica.checked_at >= self.check_every:
+                try:
+                    replica.lag = self._lag(conn)
+                except Exception as e:
+                    replica.pool.release(conn, discard=True)
+                    self._down(replica, e)
+                    continue
+                replica.checked_at = now
+                if replica.lag > self.max_lag:
+                    replica.pool.release(conn)
+                    self._down(replica, f"lag {replica.lag}s > {self.max_lag}s")
+                    continue
+            return replica, conn
+        return None, None
+
+    def release(self, replica, conn, discard=False):
+        replica.pool.release(conn, discard=discard)
+
+    def close(self):
+        for replica in self.replicas:
+            replica.pool.close()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {r.name: {"up": r.down_until <= now, "lag": r.lag, "failures": r.failures, **r.pool.stats()}
+                for r in self.replicas}
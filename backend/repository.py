@@ -0,0 +1,561 @@
+# backend/repository.py
+# Depolama katmanı: blueprint'ler SQL yazmaz, buradaki repository'leri çağırır.
+# DB_BACKEND=mysql (varsayılan) veya sqlite (yerel koşum / test / benchmark).
+import collections, datetime, sqlite3, time
+import pymysql
+from models import DB_BACKEND, SSDictCursor, checkout, get_db, reading_replica, transaction
+
+IntegrityError = (pymysql.IntegrityError, sqlite3.IntegrityError)
+
+NOT_FOUND = "not found"
+FORBIDDEN = "forbidden"
+PARTIAL = "partial"  # toplu iş süre sınırına takıldı; çağrı tekrarlanarak devam eder
+
+TASK_COLUMNS = {
+    "id": "t.id",
+    "title": "t.title",
+    "description": "t.description",
+    "status": "t.status",
+    "user_id": "t.user_id",
+    "created_at": "t.created_at",
+    "updated_at": "t.updated_at",
+    "owner_email": "u.email AS owner_email",
+}
+TASK_PATCHABLE = ("title", "description", "status")
+_EXPORT_COLUMNS = "t.id, t.title, t.description, t.status, t.user_id, t.created_at, t.updated_at"
+_ARCHIVE_COLUMNS = "a.id, a.title, a.description, a.status, a.user_id, a.created_at, a.updated_at, a.archived_at"
+
+def _in(n):
+    return "(" + ",".join(["%s"] * n) + ")"
+
+
+class MySQLDialect:
+    name = "mysql"
+    for_update = " FOR UPDATE"
+
+    def stream_cursor(self, conn):
+        return conn.cursor(SSDictCursor)
+
+    def first_insert_id(self, cursor, n):
+        # çok satırlı INSERT: lastrowid ilk satırın id'si, id'ler ardışık
+        return cursor.lastrowid
+
+    def increment(self, table, key, counter, n):
+        """INSERT n keys with counter=1, or add 1 to the existing rows."""
+        return (f"INSERT INTO {table}({key},{counter}) VALUES " + ",".join(["(%s,1)"] * n)
+                + f" ON DUPLICATE KEY UPDATE {counter}={counter}+1")
+
+    def upsert(self, table, keys, value):
+        """INSERT one row, or overwrite `value` when the key exists."""
+        cols = (*keys, value)
+        return (f"INSERT INTO {table}({','.join(cols)}) VALUES {_in(len(cols))}"
+                f" ON DUPLICATE KEY UPDATE {value}=VALUES({value})")
+
+    def add(self, table, keys, value):
+        """INSERT one row, or add `value` to the existing one."""
+        cols = (*keys, value)
+        return (f"INSERT INTO {table}({','.join(cols)}) VALUES {_in(len(cols))}"
+                f" ON DUPLICATE KEY UPDATE {value}={value}+VALUES({value})")
+
+    # InnoDB FULLTEXT: innodb_ft_min_token_size (3) altındaki kelimeler indekste yok
+    min_search_term = 3
+
+    def search(self, cols, where, terms):
+        """Full-text task search SQL -> (sql, params before the `where` params).
+        Remaining params: where params, limit, offset."""
+        q = " ".join(f"+{t}*" for t in terms)  # tüm kelimeler, önek eşleşmesi
+        match = "MATCH(t.title, t.description) AGAINST (%s IN BOOLEAN MODE)"
+        return (f"SELECT {cols}, {match} AS score FROM tasks t WHERE {match}{where}"
+                " ORDER BY score DESC, t.id DESC LIMIT %s OFFSET %s", [q, q])
+
+
+class SQLiteDialect(MySQLDialect):
+    name = "sqlite"
+    for_update = ""  # BEGIN IMMEDIATE yazma kilidini zaten alır
+
+    def stream_cursor(self, conn):
+        return conn.cursor()  # sqlite3 cursor satırları zaten tembel okur
+
+    def first_insert_id(self, cursor, n):
+        return cursor.lastrowid - n + 1
+
+    def increment(self, table, key, counter, n):
+        return (f"INSERT INTO {table}({key},{counter}) VALUES " + ",".join(["(%s,1)"] * n)
+                + f" ON CONFLICT({key}) DO UPDATE SET {counter}={counter}+1")
+
+    def upsert(self, table, keys, value):
+        cols = (*keys, value)
+        return (f"INSERT INTO {table}({','.join(cols)}) VALUES {_in(len(cols))}"
+                f" ON CONFLICT({','.join(keys)}) DO UPDATE SET {value}=excluded.{value}")
+
+    def add(self, table, keys, value):
+        cols = (*keys, value)
+        return (f"INSERT INTO {table}({','.join(cols)}) VALUES {_in(len(cols))}"
+                f" ON CONFLICT({','.join(keys)}) DO UPDATE SET {value}={value}+excluded.{value}")
+
+    min_search_term = 1
+
+    def search(self, cols, where, terms):
+        q = " ".join(f'"{t}"*' for t in terms)
+        # bm25: küçük = daha iyi; başlık eşleşmesi açıklamanın iki katı ağırlıkta
+        return (f"SELECT {cols}, -bm25(tasks_fts, 2.0, 1.0) AS score"
+                f" FROM tasks_fts JOIN tasks t ON t.id=tasks_fts.rowid WHERE tasks_fts MATCH %s{where}"
+                " ORDER BY score DESC, t.id DESC LIMIT %s OFFSET %s", [q])
+
+
+class Repository:
+    def __init__(self, dialect):
+        self.dialect = dialect
+
+    def _bump_versions(self, c, owner_ids):
+        # yazma sonrası: yalnızca sahiplerin sürümü artar -> eski ETag/cache geçersiz.
+        # Tüm-görevler (0) için ortak satır yok: her yazan aynı satırda kilit beklerdi; bkz. version(0)
+        scopes = sorted(set(owner_ids))
+        if not scopes:
+            return
+        c.execute(self.dialect.increment("task_versions", "scope", "version", len(scopes)), scopes)
+
+    def _batches(self, select_sql, params, batch, apply, deadline=None, pause=0.0):
+        """Run apply(cursor, rows) on successive `select_sql ... LIMIT batch` results,
+        each batch in its own short transaction so row locks are never held for long.
+        Returns the number of rows handled, or PARTIAL if `deadline` (monotonic) passed first."""
+        done = 0
+        while True:
+            with transaction() as c:
+                c.execute(f"{select_sql} LIMIT %s{self.dialect.for_update}", [*params, batch])
+                rows = c.fetchall()
+                if rows:
+                    apply(c, rows)
+            done += len(rows)
+            if len(rows) < batch:
+                return done
+            if deadline is not None and time.monotonic() >= deadline:
+                return PARTIAL
+            if pause:
+                time.sleep(pause)  # araya başka yazmalar girebilsin
+
+    def _stream(self, sql, params=(), batch=500):
+        """Yield row batches from an unbuffered cursor on a dedicated checkout (a replica when routed there)."""
+        conn, release = checkout(readonly=True)
+        done = False
+        try:
+            cur = self.dialect.stream_cursor(conn)
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch)
+                if not rows:
+                    break
+                yield rows
+            cur.close()
+            done = True
+        finally:
+            # Yarıda kalan SS cursor'ı boşaltmak tüm tabloyu okumak demek -> bağlantıyı at
+            release(conn, discard=not done)
+
+
+class UserRepository(Repository):
+    def create(self, email, password_hash, role="basic"):
+        with get_db().cursor() as c:
+            c.execute("INSERT INTO users(email,password_hash,role) VALUES(%s,%s,%s)",
+                      (email, password_hash, role))
+            return c.lastrowid
+
+    def by_email(self, email):
+        u = self._by_email(get_db(readonly=True), email)
+        if u is None and reading_replica():
+            # yeni kayıt replikaya henüz ulaşmamış olabilir: bulunamayan e-posta birincilde denenir
+            u = self._by_email(get_db(), email)
+        return u
+
+    def _by_email(self, conn, email):
+        with conn.cursor() as c:
+            c.execute("SELECT id,email,password_hash,role,created_at FROM users WHERE email=%s", (email,))
+            return c.fetchone()
+
+    def set_password_hash(self, uid, password_hash):
+        with get_db().cursor() as c:
+            c.execute("UPDATE users SET password_hash=%s WHERE id=%s", (password_hash, uid))
+
+    def list_all(self):
+        with get_db(readonly=True).cursor() as c:
+            c.execute("SELECT id, email, role, created_at FROM users ORDER BY id DESC")
+            return c.fetchall()
+
+    def stream_all(self):
+        return self._stream("SELECT id, email, role, created_at FROM users ORDER BY id")
+
+    def delete(self, uid, now, batch=500, deadline=None):
+        """Delete a user, their tasks and archived tasks in committed batches.
+        Returns None when done, NOT_FOUND, or PARTIAL if `deadline` passed first
+        (the user still exists; repeating the call continues where it stopped)."""
+        with get_db().cursor() as c:
+            c.execute("SELECT id FROM users WHERE id=%s", (uid,))
+            if not c.fetchone():
+                return NOT_FOUND
+
+        def drop_tasks(c, rows):
+            ids = [r["id"] for r in rows]
+            # silinen görevler değişiklik akışında tombstone olarak görünsün
+            c.execute("INSERT INTO task_tombstones(task_id,user_id,deleted_at) VALUES "
+                      + ",".join(["(%s,%s,%s)"] * len(ids)), [v for tid in ids for v in (tid, uid, now)])
+            c.execute(f"DELETE FROM tasks WHERE id IN {_in(len(ids))}", ids)
+            self._bump_versions(c, [uid])
+
+        def drop_archived(c, rows):
+            ids = [r["id"] for r in rows]
+            c.execute(f"DELETE FROM tasks_archive WHERE id IN {_in(len(ids))}", ids)
+
+        # sıra gerekmez: her batch kalanlardan herhangi bir dilimi siler
+        for select, apply in (("SELECT id FROM tasks WHERE user_id=%s", drop_tasks),
+                              ("SELECT id FROM tasks_archive WHERE user_id=%s", drop_archived)):
+            if self._batches(select, [uid], batch, apply, deadline) == PARTIAL:
+                return PARTIAL
+
+        with transaction() as c:
+            # bu arada eklenmiş olabilecek birkaç görev cascade ile gider
+            c.execute("""INSERT INTO task_tombstones(task_id,user_id,deleted_at)
+                         SELECT id, user_id, %s FROM tasks WHERE user_id=%s""", (now, uid))
+            c.execute("DELETE FROM users WHERE id=%s", (uid,))
+            if not c.rowcount:
+                return NOT_FOUND
+            # MySQL'de cascade silme tetikleyicileri çalıştırmaz: sayaçlar burada temizlenir
+            c.execute("DELETE FROM task_counts WHERE user_id=%s", (uid,))
+            c.execute("DELETE FROM task_daily WHERE user_id=%s", (uid,))
+            self._bump_versions(c, [uid])
+        return None
+
+
+class TaskRepository(Repository):
+    def version(self, scope) -> int:
+        """Change version of a task list (scope = user id, 0 = all tasks).
+
+        The all-tasks version is the sum of the per-user versions: every write bumps
+        at least one of them, and rows are never deleted, so the sum only grows.
+        """
+        with get_db(readonly=True).cursor() as c:
+            if scope == 0:
+                c.execute("SELECT COALESCE(SUM(version), 0) AS version FROM task_versions WHERE scope > 0")
+            else:
+                c.execute("SELECT version FROM task_versions WHERE scope=%s", (scope,))
+            r = c.fetchone()
+        return r["version"] if r else 0
+
+    def page(self, select, limit, viewer_id=None, viewer_email=None, owner=None,
+             statuses=None, created_from=None, created_to=None, after=None):
+        """One keyset page ordered by (created_at, id) DESC.
+
+        viewer_id=None means admin scope. Returns (rows, next_key) where
+        next_key is the (created_at, id) of the last row when more rows exist.
+        """
+        cols, cols_params = [TASK_COLUMNS[f] for f in select], []
+        where, params = [], []
+        need_join = False
+        if viewer_id is not None:
+            # kendi görevleri: tasks.user_id indeksi, users join'i yok
+            where.append("t.user_id=%s"); params.append(viewer_id)
+            if "owner_email" in select:
+                cols[select.index("owner_email")] = "%s AS owner_email"
+                cols_params.append(viewer_email)
+        else:
+            need_join = "owner_email" in select
+            if isinstance(owner, int):
+                where.append("t.user_id=%s"); params.append(owner)
+            elif owner:
+                where.append("u.email=%s"); params.append(owner)
+                need_join = True
+        if statuses:
+            where.append("t.status IN " + _in(len(statuses)))
+            params.extend(statuses)
+        if created_from:
+            where.append("t.created_at >= %s"); params.append(created_from)
+        if created_to:
+            where.append("t.created_at < %s"); params.append(created_to)
+        if after:
+            where.append("(t.created_at < %s OR (t.created_at = %s AND t.id < %s))")
+            params.extend([after[0], after[0], after[1]])
+
+        sql = "SELECT " + ", ".join(cols) + " FROM tasks t"
+        if need_join:
+            sql += " JOIN users u ON u.id=t.user_id"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY t.created_at DESC, t.id DESC LIMIT %s"
+        params.append(limit + 1)
+
+        with get_db(readonly=True).cursor() as c:
+            c.execute(sql, cols_params + params)
+            rows = c.fetchall()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, (rows[-1]["created_at"], rows[-1]["id"])
+        return rows, None
+
+    def archived_page(self, limit, viewer_id=None, owner=None, after=None):
+        """Keyset page of archived tasks, (created_at, id) DESC -> (rows, next_key)."""
+        where, params = [], []
+        if viewer_id is not None or owner is not None:
+            where.append("a.user_id=%s"); params.append(viewer_id if viewer_id is not None else owner)
+        if after:
+            where.append("(a.created_at < %s OR (a.created_at = %s AND a.id < %s))")
+            params.extend([after[0], after[0], after[1]])
+        sql = f"SELECT {_ARCHIVE_COLUMNS} FROM tasks_archive a"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY a.created_at DESC, a.id DESC LIMIT %s"
+        with get_db(readonly=True).cursor() as c:
+            c.execute(sql, params + [limit + 1])
+            rows = c.fetchall()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, (rows[-1]["created_at"], rows[-1]["id"])
+        return rows, None
+
+    def archive(self, cutoff, now, batch=500, deadline=None, pause=0.0):
+        """Move 'done' tasks last updated before `cutoff` to tasks_archive, one committed
+        batch at a time. Live readers see them disappear (tombstone + version bump)."""
+        def move(c, rows):
+            ids = [r["id"] for r in rows]
+            c.execute(f"""INSERT INTO tasks_archive(id,title,description,status,user_id,created_at,updated_at,archived_at)
+                          SELECT id,title,description,status,user_id,created_at,updated_at,%s
+                          FROM tasks WHERE id IN {_in(len(ids))}""", [now, *ids])
+            c.execute("INSERT INTO task_tombstones(task_id,user_id,deleted_at) VALUES "
+                      + ",".join(["(%s,%s,%s)"] * len(rows)),
+                      [v for r in rows for v in (r["id"], r["user_id"], now)])
+            c.execute(f"DELETE FROM tasks WHERE id IN {_in(len(ids))}", ids)
+            # silme tetikleyicisi sayaçları düşürdü: arşivdeki görevler istatistikte kalır, geri eklenir
+            for table, keys, counts in (
+                    ("task_counts", ("user_id", "status"), collections.Counter((r["user_id"], r["status"]) for r in rows)),
+                    ("task_daily", ("user_id", "day"), collections.Counter((r["user_id"], r["created_at"].date()) for r in rows))):
+                c.executemany(self.dialect.add(table, keys, "n"), [(*key, n) for key, n in counts.items()])
+            self._bump_versions(c, {r["user_id"] for r in rows})
+
+        return self._batches("""SELECT id, user_id, status, created_at FROM tasks WHERE status='done' AND updated_at < %s
+                                ORDER BY updated_at, id""", [cutoff], batch, move, deadline, pause)
+
+    def prune_tombstones(self, before, batch=1000, deadline=None, pause=0.0):
+        def drop(c, rows):
+            ids = [r["task_id"] for r in rows]
+            c.execute(f"DELETE FROM task_tombstones WHERE task_id IN {_in(len(ids))}", ids)
+
+        return self._batches("SELECT task_id FROM task_tombstones WHERE deleted_at < %s ORDER BY deleted_at, task_id",
+                             [before], batch, drop, deadline, pause)
+
+    def search(self, terms, viewer_id=None, limit=20, offset=0):
+        """Ranked full-text matches of all terms (prefix match) in title/description.
+        Returns (rows, has_more); rows carry a `score` (higher = better)."""
+        terms = [t for t in terms if len(t) >= self.dialect.min_search_term]
+        if not terms:
+            return [], False
+        where, params = ("", []) if viewer_id is None else (" AND t.user_id=%s", [viewer_id])
+        sql, head = self.dialect.search(_EXPORT_COLUMNS, where, terms)
+        with get_db(readonly=True).cursor() as c:
+            c.execute(sql, head + params + [limit + 1, offset])
+            rows = c.fetchall()
+        return rows[:limit], len(rows) > limit
+
+    def stream(self, viewer_id=None):
+        if viewer_id is None:
+            return self._stream(f"SELECT {_EXPORT_COLUMNS} FROM tasks t ORDER BY t.id")
+        return self._stream(f"SELECT {_EXPORT_COLUMNS} FROM tasks t WHERE t.user_id=%s ORDER BY t.id",
+                            (viewer_id,))
+
+    def create(self, uid, title, description, status, now):
+        with get_db().cursor() as c:
+            c.execute("""INSERT INTO tasks(title,description,status,user_id,created_at,updated_at)
+                         VALUES(%s,%s,%s,%s,%s,%s)""",
+                      (title, description, status, uid, now, now))
+            tid = c.lastrowid
+            self._bump_versions(c, [uid])
+            return tid
+
+    def _owned(self, tid, viewer_id, sql, params, tombstone_at=None):
+        """Single-task UPDATE/DELETE with ownership in its WHERE clause.
+        Only when no row matched is the task looked up to tell 404 from 403.
+        With tombstone_at (deletes) the statement and its tombstone share a transaction."""
+        sql += " WHERE id=%s"
+        params = [*params, tid]
+        if viewer_id is not None:
+            sql += " AND user_id=%s"
+            params.append(viewer_id)
+        with (transaction() if tombstone_at else get_db().cursor()) as c:
+            owner = viewer_id
+            if owner is None:
+                # admin: sahibin sürümünü artırmak için user_id gerekli
+                c.execute("SELECT user_id FROM tasks WHERE id=%s", (tid,))
+                r = c.fetchone()
+                if not r:
+                    return NOT_FOUND
+                owner = r["user_id"]
+            c.execute(sql, params)
+            if c.rowcount:
+                if tombstone_at:
+                    c.execute("INSERT INTO task_tombstones(task_id,user_id,deleted_at) VALUES(%s,%s,%s)",
+                              (tid, owner, tombstone_at))
+                self._bump_versions(c, [owner])
+                return None
+            if viewer_id is None:
+                return NOT_FOUND
+            c.execute("SELECT id FROM tasks WHERE id=%s", (tid,))
+            return FORBIDDEN if c.fetchone() else NOT_FOUND
+
+    def update(self, tid, viewer_id, values, now):
+        fields = [f for f in TASK_PATCHABLE if f in values]
+        return self._owned(tid, viewer_id,
+                           "UPDATE tasks SET " + ", ".join(f"{f}=%s" for f in fields) + ", updated_at=%s",
+                           [*(values[f] for f in fields), now])
+
+    def toggle(self, tid, viewer_id, now):
+        return self._owned(tid, viewer_id,
+                           "UPDATE tasks SET status=CASE WHEN status='done' THEN 'todo' ELSE 'done' END, updated_at=%s",
+                           [now])
+
+    def delete(self, tid, viewer_id, now):
+        return self._owned(tid, viewer_id, "DELETE FROM tasks", [], tombstone_at=now)
+
+    # ---------- Bulk: tek transaction ----------
+    def _lock_owned(self, c, ids, viewer_id):
+        """One SELECT for the whole batch; returns (ids to mutate, {id: error}, {id: owner})."""
+        c.execute(f"SELECT id, user_id FROM tasks WHERE id IN {_in(len(ids))}{self.dialect.for_update}",
+                  list(ids))
+        owners = {r["id"]: r["user_id"] for r in c.fetchall()}
+        targets, errors = [], {}
+        for tid in ids:
+            if tid not in owners:
+                errors[tid] = NOT_FOUND
+            elif viewer_id is not None and owners[tid] != viewer_id:
+                errors[tid] = FORBIDDEN
+            else:
+                targets.append(tid)
+        return targets, errors, {tid: owners[tid] for tid in targets}
+
+    def bulk_create(self, uid, rows, now):
+        """rows: [(title, description, status)] -> list of new ids, in order."""
+        with transaction() as c:
+            c.execute("INSERT INTO tasks(title,description,status,user_id,created_at,updated_at) VALUES "
+                      + ",".join(["(%s,%s,%s,%s,%s,%s)"] * len(rows)),
+                      [v for t, d, s in rows for v in (t, d, s, uid, now, now)])
+            first = self.dialect.first_insert_id(c, len(rows))
+            self._bump_versions(c, [uid])
+        return [first + k for k in range(len(rows))]
+
+    def bulk_update(self, changes, viewer_id, now):
+        """changes: {id: {field: value}} -> {id: error} for rows not updated."""
+        with transaction() as c:
+            targets, errors, owners = self._lock_owned(c, list(changes), viewer_id)
+            if targets:
+                sets, params = [], []
+                for f in TASK_PATCHABLE:
+                    cases = [(tid, changes[tid][f]) for tid in targets if f in changes[tid]]
+                    if cases:
+                        sets.append(f"{f}=CASE id " + " ".join(["WHEN %s THEN %s"] * len(cases)) + f" ELSE {f} END")
+                        params.extend(v for case in cases for v in case)
+                sets.append("updated_at=%s"); params.append(now)
+                sql = f"UPDATE tasks SET {', '.join(sets)} WHERE id IN {_in(len(targets))}"
+                params.extend(targets)
+                if viewer_id is not None:
+                    sql += " AND user_id=%s"; params.append(viewer_id)
+                c.execute(sql, params)
+                self._bump_versions(c, owners.values())
+        return errors
+
+    def bulk_delete(self, ids, viewer_id, now):
+        """-> {id: error} for rows not deleted."""
+        with transaction() as c:
+            targets, errors, owners = self._lock_owned(c, ids, viewer_id)
+            if targets:
+                sql = f"DELETE FROM tasks WHERE id IN {_in(len(targets))}"
+                params = list(targets)
+                if viewer_id is not None:
+                    sql += " AND user_id=%s"; params.append(viewer_id)
+                c.execute(sql, params)
+                c.execute("INSERT INTO task_tombstones(task_id,user_id,deleted_at) VALUES "
+                          + ",".join(["(%s,%s,%s)"] * len(targets)),
+                          [v for tid in targets for v in (tid, owners[tid], now)])
+                self._bump_versions(c, owners.values())
+        return errors
+
+    # ---------- Değişiklik akışı ----------
+    def changes(self, viewer_id, after_task, after_tomb, until, limit):
+        """Tasks changed and tasks deleted after the given (timestamp, id) keys, up to `until`.
+        Returns (changed rows, deleted rows), each ordered by its key, at most `limit` each."""
+        scope, scope_params = ("t.user_id=%s AND ", [viewer_id]) if viewer_id is not None else ("", [])
+        # birincilde: settle penceresinden fazla geciken replika akışa değişiklik atlatır
+        with get_db().cursor() as c:
+            c.execute(f"""SELECT {_EXPORT_COLUMNS} FROM tasks t
+                          WHERE {scope}t.updated_at >= %s AND (t.updated_at > %s OR t.id > %s)
+                            AND t.updated_at <= %s
+                          ORDER BY t.updated_at, t.id LIMIT %s""",
+                      [*scope_params, after_task[0], after_task[0], after_task[1], until, limit])
+            changed = c.fetchall()
+            scope = scope.replace("t.user_id", "d.user_id")
+            c.execute(f"""SELECT d.task_id AS id, d.deleted_at FROM task_tombstones d
+                          WHERE {scope}d.deleted_at >= %s AND (d.deleted_at > %s OR d.task_id > %s)
+                            AND d.deleted_at <= %s
+                          ORDER BY d.deleted_at, d.task_id LIMIT %s""",
+                      [*scope_params, after_tomb[0], after_tomb[0], after_tomb[1], until, limit])
+            deleted = c.fetchall()
+        return changed, deleted
+
+
+# sayaçlar canlı + arşivlenmiş görevleri sayar
+_ALL_TASKS = ("(SELECT user_id, status, created_at FROM tasks"
+              " UNION ALL SELECT user_id, status, created_at FROM tasks_archive)")
+
+def _key(row, keys):
+    # DATE(...) ifadesi SQLite'ta metin, DATE sütunu date döner: karşılaştırma için ISO metin
+    return tuple(v.isoformat() if isinstance(v, datetime.date) else v for v in (row[k] for k in keys))
+
+
+class StatsRepository(Repository):
+    """Task counters kept by triggers on tasks (migration 6); reads never touch tasks.
+    Archived tasks stay counted: TaskRepository.archive adds them back after the delete trigger."""
+
+    def by_status(self, user_id=None):
+        where, params = ("", []) if user_id is None else (" WHERE user_id=%s", [user_id])
+        with get_db(readonly=True).cursor() as c:
+            c.execute(f"SELECT status, SUM(n) AS n FROM task_counts{where} GROUP BY status", params)
+            return {r["status"]: int(r["n"]) for r in c.fetchall() if r["n"]}
+
+    def by_day(self, since, user_id=None):
+        """Existing tasks per creation day from `since` on: [(date, count)]."""
+        where, params = ("day >= %s", [since]) if user_id is None else ("user_id=%s AND day >= %s", [user_id, since])
+        with get_db(readonly=True).cursor() as c:
+            c.execute(f"SELECT day, SUM(n) AS n FROM task_daily WHERE {where} GROUP BY day ORDER BY day", params)
+            return [(r["day"], int(r["n"])) for r in c.fetchall() if r["n"]]
+
+    def top_owners(self, limit):
+        with get_db(readonly=True).cursor() as c:
+            c.execute("""SELECT k.user_id, u.email, SUM(k.n) AS n FROM task_counts k
+                         JOIN users u ON u.id=k.user_id
+                         GROUP BY k.user_id, u.email HAVING SUM(k.n) > 0
+                         ORDER BY n DESC, k.user_id LIMIT %s""", (limit,))
+            return [{"user_id": r["user_id"], "email": r["email"], "total": int(r["n"])} for r in c.fetchall()]
+
+    def _reconcile(self, c, table, keys, actual_sql):
+        c.execute(f"SELECT {', '.join(keys)}, n FROM {table}{self.dialect.for_update}")
+        stored = {_key(r, keys): r["n"] for r in c.fetchall()}
+        c.execute(actual_sql)
+        actual = {_key(r, keys): r["n"] for r in c.fetchall()}
+        drift = [(*key, actual.get(key, 0)) for key in stored.keys() | actual.keys()
+                 if stored.get(key, 0) != actual.get(key, 0)]
+        if drift:
+            c.executemany(self.dialect.upsert(table, keys, "n"), drift)
+        c.execute(f"DELETE FROM {table} WHERE n=0")
+        return len(drift)
+
+    def reconcile(self):
+        """Recount from tasks + tasks_archive and correct drifted counters -> {table: rows corrected}.
+        Counter rows are locked first so concurrent writers wait instead of racing the recount."""
+        with transaction() as c:
+            return {
+                "task_counts": self._reconcile(c, "task_counts", ("user_id", "status"),
+                    f"SELECT user_id, status, COUNT(*) AS n FROM {_ALL_TASKS} t GROUP BY user_id, status"),
+                "task_daily": self._reconcile(c, "task_daily", ("user_id", "day"),
+                    f"SELECT user_id, DATE(created_at) AS day, COUNT(*) AS n FROM {_ALL_TASKS} t GROUP BY user_id, DATE(created_at)"),
+            }
+
+
+DIALECT = SQLiteDialect() if DB_BACKEND == "sqlite" else MySQLDialect()
+users = UserRepository(DIALECT)
+tasks = TaskRepository(DIALECT)
+stats = StatsRepository(DIALECT)
@@ -0,0 +1,126 @@
+# backend/storage.py
+# SQLite stand-in: pymysql bağlantısının kullandığımız kısmını taklit eder
+# (cursor() context manager, DictCursor satırları, %s parametreleri, begin/commit/rollback, ping)
+import datetime, os, sqlite3, time
+from models import record_query
+
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATETIME", lambda b: datetime.datetime.fromisoformat(b.decode()))
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+
+
+def _dict_row(cursor, row):
+    return {d[0]: v for d, v in zip(cursor.description, row)}
+
+def _translate(sql: str) -> str:
+    # pymysql paramstyle (%s, %%) -> sqlite3 (?, %)
+    return sql.replace("%s", "?").replace("%%", "%")
+
+
+class SQLiteCursor:
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def execute(self, sql, params=()):
+        t0 = time.perf_counter()
+        try:
+            self._cur.execute(_translate(sql), tuple(params or ()))
+        finally:
+            record_query(sql, time.perf_counter() - t0, params)
+        return self._cur.rowcount
+
+    def executemany(self, sql, seq):
+        t0 = time.perf_counter()
+        try:
+            self._cur.executemany(_translate(sql), [tuple(p) for p in seq])
+        finally:
+            record_query(sql, time.perf_counter() - t0)
+        return self._cur.rowcount
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def fetchmany(self, size=None):
+        return self._cur.fetchmany(size or self._cur.arraysize)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def close(self):
+        self._cur.close()
+
+
+class SQLiteConnection:
+    def __init__(self, raw):
+        self._raw = raw
+        self.open = True
+
+    def cursor(self, cursorclass=None):
+        return SQLiteCursor(self._raw)
+
+    def begin(self):
+        # IMMEDIATE: yazma kilidi transaction başında alınır (MySQL'deki FOR UPDATE karşılığı)
+        self._raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def ping(self, reconnect=False):
+        self._raw.execute("SELECT 1")
+
+    def close(self):
+        if self.open:
+            self.open = False
+            self._raw.close()
+
+
+_keepalive = None
+
+def connect_sqlite(path=None, read_only=False):
+    """Open a pymysql-like connection to the SQLite stand-in (schema: migrations.py).
+    read_only=True: replica stand-in, any write fails (PRAGMA query_only)."""
+    global _keepalive
+    path = path or os.getenv("SQLITE_PATH", "taskdb.sqlite3")
+    uri = path.startswith("file:")
+    if path == ":memory:":
+        # havuzdaki bağlantılar aynı bellek içi veritabanını paylaşsın
+        path, uri = "file:taskdb?mode=memory&cache=shared", True
+    raw = sqlite3.connect(path, uri=uri, isolation_level=None, check_same_thread=False,
+                          detect_types=sqlite3.PARSE_DECLTYPES, timeout=30)
+    raw.row_factory = _dict_row
+    raw.execute("PRAGMA foreign_keys=ON")
+    if not path.startswith("file:"):
+        raw.execute("PRAGMA journal_mode=WAL")
+        raw.execute("PRAGMA synchronous=NORMAL")
+    if read_only:
+        raw.execute("PRAGMA query_only=ON")
+    conn = SQLiteConnection(raw)
+    if uri and "mode=memory" in path and _keepalive is None:
+        # son bağlantı kapanınca bellek içi DB silinir; bir tanesini açık tut
+        _keepalive = sqlite3.connect(path, uri=True, check_same_thread=False)
+    return conn
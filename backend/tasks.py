@@ -1,87 +1,391 @@
 # backend/tasks.py
-import datetime
-from flask import Blueprint, request, jsonify
+import base64, binascii, datetime, hashlib, json, os, re, threading, time
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
-from models import get_db
+import repository as repo
+from repository import TASK_COLUMNS, TASK_PATCHABLE as _PATCHABLE
+from export import ndjson_response
+from users import current_user_id, is_admin
+from cache import TTLCache
+from models import release_db
 
 tasks_bp = Blueprint("tasks", __name__, url_prefix="/api/tasks")
 
+_ERRORS = {repo.NOT_FOUND: 404, repo.FORBIDDEN: 403}
+
+def _viewer():
+    """None for admins (all tasks), else the caller's user id."""
+    return None if is_admin() else current_user_id()
+
+def _error(err):
+    return {"msg": err}, _ERRORS[err]
+
+# list_tasks: keyset sayfalama (created_at DESC, id DESC), filtre ve alan seçimi
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+# Kodlanmış liste yanıtları; anahtar (scope, sürüm, sorgu) olduğundan yazma sonrası eski
+# girdiler hiç okunmaz ve LRU ile düşer. Sürüm DB'de tutulur -> tüm worker'larda tutarlı.
+_list_cache = TTLCache(int(os.getenv("TASKS_CACHE_SIZE", "256")), float(os.getenv("TASKS_CACHE_TTL", "60")))
+
+def _encode_token(obj) -> str:
+    raw = json.dumps(obj).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_token(token: str):
+    return json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+
+def encode_cursor(created_at, tid) -> str:
+    return _encode_token([created_at.isoformat(), tid])
+
+def decode_cursor(token: str):
+    created_at, tid = _decode_token(token)
+    return datetime.datetime.fromisoformat(created_at), int(tid)
+
+def _parse_date(value: str):
+    d = datetime.datetime.fromisoformat(value)
+    return d.replace(tzinfo=None) if d.tzinfo else d
+
 @tasks_bp.get("")
 @jwt_required()
 def list_tasks():
     claims = get_jwt()
     role = claims.get("role")
-    email = claims.get("email")
-    with get_db().cursor() as c:
-        if role == "admin":
-            c.execute("""SELECT t.*, u.email AS owner_email
-                         FROM tasks t JOIN users u ON u.id=t.user_id
-                         ORDER BY t.created_at DESC""")
-        else:
-            c.execute("""SELECT t.*, u.email AS owner_email
-                         FROM tasks t JOIN users u ON u.id=t.user_id
-                         WHERE u.email=%s
-                         ORDER BY t.created_at DESC""", (email,))
-        return jsonify(items=c.fetchall()), 200
+    args = request.args
+
+    try:
+        limit = min(max(int(args.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        cursor = decode_cursor(args["cursor"]) if args.get("cursor") else None
+        created_from = _parse_date(args["created_from"]) if args.get("created_from") else None
+        created_to = _parse_date(args["created_to"]) if args.get("created_to") else None
+    except (ValueError, TypeError, binascii.Error):
+        return {"msg": "bad limit/cursor/date"}, 400
+
+    fields = [f.strip() for f in args.get("fields", "").split(",") if f.strip()] or list(TASK_COLUMNS)
+    unknown = [f for f in fields if f not in TASK_COLUMNS]
+    if unknown:
+        return {"msg": f"unknown fields: {','.join(unknown)}"}, 400
+    # cursor için id ve created_at her zaman okunur, istenmediyse çıktıdan atılır
+    select = list(dict.fromkeys(["id", "created_at", *fields]))
+
+    viewer = None if role == "admin" else current_user_id()
+    scope = 0 if viewer is None else viewer
+    query = "&".join(sorted(f"{k}={v}" for k, v in args.items(multi=True)))
+    version = repo.tasks.version(scope)
+    etag = f"{scope}-{version}-{hashlib.sha1(query.encode()).hexdigest()[:16]}"
+    # zayıf karşılaştırma: sıkıştırılmış yanıtın ETag'i W/ önekiyle döner (encoding.py)
+    if request.if_none_match.contains_weak(etag):
+        return "", 304, {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+
+    key = (scope, version, query)
+    body = _list_cache.get(key)
+    if body is None:
+        owner = None
+        if viewer is None and args.get("owner"):
+            owner = int(args["owner"]) if args["owner"].isdigit() else args["owner"]
+        rows, next_key = repo.tasks.page(
+            select, limit,
+            viewer_id=viewer,
+            viewer_email=claims.get("email"),
+            owner=owner,
+            statuses=[s for s in args.get("status", "").split(",") if s],
+            created_from=created_from, created_to=created_to, after=cursor,
+        )
+        next_cursor = encode_cursor(*next_key) if next_key else None
+        drop = [k for k in ("id", "created_at") if k not in fields]
+        for r in rows:
+            for k in drop:
+                r.pop(k, None)
+        body = jsonify(items=rows, next_cursor=next_cursor).get_data()
+        _list_cache.set(key, body)
+
+    resp = current_app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp, 200
+
+@tasks_bp.get("/export")
+@jwt_required()
+def export_tasks():
+    return ndjson_response(repo.tasks.stream(_viewer()), "tasks.ndjson")
+
+# ---------- Arşiv: jobs.py archive ile taşınan eski 'done' görevler (salt okunur) ----------
+@tasks_bp.get("/archive")
+@jwt_required()
+def archived_tasks():
+    args = request.args
+    try:
+        limit = min(max(int(args.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        cursor = decode_cursor(args["cursor"]) if args.get("cursor") else None
+        owner = int(args["owner"]) if args.get("owner") else None
+    except (ValueError, TypeError, binascii.Error):
+        return {"msg": "bad limit/cursor/owner"}, 400
+    rows, next_key = repo.tasks.archived_page(limit, _viewer(), owner, cursor)
+    return jsonify(items=rows, next_cursor=encode_cursor(*next_key) if next_key else None), 200
+
+# ---------- İstatistik: tetikleyicilerin tuttuğu sayaçlardan, görev sayısından bağımsız ----------
+STATS_MAX_DAYS = 366
+STATS_MAX_OWNERS = 100
+
+@tasks_bp.get("/stats")
+@jwt_required()
+def task_stats():
+    args = request.args
+    try:
+        days = min(max(int(args.get("days", 30)), 1), STATS_MAX_DAYS)
+        top = min(max(int(args.get("owners", 10)), 0), STATS_MAX_OWNERS)
+        owner = int(args["owner"]) if args.get("owner") else None
+    except ValueError:
+        return {"msg": "bad days/owners/owner"}, 400
+    viewer = _viewer()
+    scope = viewer if viewer is not None else owner  # admin: owner=<id> ile tek kullanıcı
+    since = datetime.datetime.utcnow().date() - datetime.timedelta(days=days - 1)
+    by_status = repo.stats.by_status(scope)
+    body = {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_day": [{"day": d.isoformat(), "count": n} for d, n in repo.stats.by_day(since, scope)],
+    }
+    if viewer is None and owner is None and top:
+        body["by_owner"] = repo.stats.top_owners(top)
+    return jsonify(body), 200
+
+# ---------- Arama: q içindeki kelimelerin hepsi (önek), alaka sırasına göre ----------
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_TERMS = 8
+SEARCH_MAX_OFFSET = int(os.getenv("SEARCH_MAX_OFFSET", "1000"))
+
+@tasks_bp.get("/search")
+@jwt_required()
+def search_tasks():
+    args = request.args
+    # yalnızca kelime karakterleri: FTS / BOOLEAN MODE operatörleri kullanıcıdan gelmez
+    terms = re.findall(r"\w+", args.get("q", "").lower())[:SEARCH_MAX_TERMS]
+    if not terms:
+        return {"msg": "q required"}, 400
+    try:
+        limit = min(max(int(args.get("limit", SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        offset = _decode_token(args["cursor"])["o"] if args.get("cursor") else 0
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return {"msg": "bad limit/cursor"}, 400
+    # cursor istemciden gelir: yalnızca sunucunun verebileceği ofsetler kabul edilir
+    if not isinstance(offset, int) or isinstance(offset, bool) or not 0 <= offset <= SEARCH_MAX_OFFSET:
+        return {"msg": "bad limit/cursor"}, 400
+    rows, has_more = repo.tasks.search(terms, _viewer(), limit, offset)
+    more = has_more and offset + limit <= SEARCH_MAX_OFFSET
+    return jsonify(items=rows, next_cursor=_encode_token({"o": offset + limit}) if more else None), 200
+
+# ---------- Değişiklik akışı: since=<token> sonrası değişen / silinen görevler ----------
+CHANGES_SETTLE = datetime.timedelta(milliseconds=int(os.getenv("CHANGES_SETTLE_MS", "1000")))
+CHANGES_MAX_WAIT = float(os.getenv("CHANGES_MAX_WAIT", "25"))
+CHANGES_POLL = float(os.getenv("CHANGES_POLL_INTERVAL", "1"))
+# Bekleyen her long-poll bir gthread istek thread'i tutar: worker başına en fazla
+# CHANGES_MAX_WAITERS istek bekler (WEB_THREADS'in altında), fazlası hemen yanıtlanır
+# ve Retry-After ile geri çevrilir -> bekleyiciler normal istekleri aç bırakamaz
+_THREADS = int(os.getenv("WEB_THREADS", "4"))
+CHANGES_MAX_WAITERS = min(int(os.getenv("CHANGES_MAX_WAITERS", "1")), max(_THREADS - 1, 0))
+_waiters = threading.BoundedSemaphore(CHANGES_MAX_WAITERS) if CHANGES_MAX_WAITERS > 0 else None
+TOMBSTONE_RETENTION = datetime.timedelta(days=int(os.getenv("TOMBSTONE_RETENTION_DAYS", "30")))
+_EPOCH = datetime.datetime(1970, 1, 1)
+_ALL_IDS = 2 ** 62  # (ts, _ALL_IDS): ts anına kadar her şey görüldü
+
+def _key(pair):
+    return datetime.datetime.fromisoformat(pair[0]), int(pair[1])
+
+@tasks_bp.get("/changes")
+@jwt_required()
+def task_changes():
+    args = request.args
+    try:
+        limit = min(max(int(args.get("limit", MAX_LIMIT)), 1), MAX_LIMIT)
+        wait = min(max(float(args.get("wait", 0)), 0.0), CHANGES_MAX_WAIT)
+        tok = _decode_token(args["since"]) if args.get("since") else None
+        after_task = _key(tok["t"]) if tok else (_EPOCH, 0)
+        after_tomb = _key(tok["d"]) if tok else (_EPOCH, 0)
+    except (ValueError, TypeError, KeyError, IndexError, binascii.Error):
+        return {"msg": "bad since/limit/wait"}, 400
+    if tok and after_tomb[0] < datetime.datetime.utcnow() - TOMBSTONE_RETENTION:
+        # tombstone'lar budanmış olabilir: tam senkron gerekir
+        return {"msg": "token expired, full resync required"}, 410
+
+    waiting = wait > 0 and _waiters is not None and _waiters.acquire(blocking=False)
+    busy = wait > 0 and not waiting
+    try:
+        return _changes(limit, wait if waiting else 0.0, after_task, after_tomb, busy)
+    finally:
+        if waiting:
+            _waiters.release()
+
+def _changes(limit, wait, after_task, after_tomb, busy):
+    viewer = _viewer()
+    deadline = time.monotonic() + wait
+    while True:
+        # Yakın geçmiş (settle) hariç: geç commit edilen satırlar atlanmasın
+        until = datetime.datetime.utcnow() - CHANGES_SETTLE
+        changed, deleted = repo.tasks.changes(viewer, after_task, after_tomb, until, limit)
+        if changed or deleted or time.monotonic() >= deadline:
+            break
+        # long-poll: beklerken DB bağlantısını havuza bırak
+        release_db()
+        time.sleep(min(CHANGES_POLL, max(deadline - time.monotonic(), 0)))
+
+    def next_key(rows, ts_field, after):
+        if len(rows) == limit:
+            return [rows[-1][ts_field].isoformat(), rows[-1]["id"]]
+        return [max(after[0], until).isoformat(), _ALL_IDS]  # until'e kadar tükendi
+    token = _encode_token({"t": next_key(changed, "updated_at", after_task),
+                           "d": next_key(deleted, "deleted_at", after_tomb)})
+    resp = jsonify(changes=changed, deleted=deleted, next=token,
+                   has_more=len(changed) == limit or len(deleted) == limit)
+    if busy and not (changed or deleted):
+        # bekleme yeri yoktu: istemci hemen tekrar sormasın
+        resp.headers["Retry-After"] = str(max(int(CHANGES_POLL), 1))
+    return resp, 200
 
 @tasks_bp.post("")
 @jwt_required()
 def create_task():
-    d = request.get_json() or {}
-    title = d.get("title")
-    if not title:
-        return {"msg":"title required"}, 400
+    d = request.get_json(silent=True)
+    bad = _invalid(d, creating=True)
+    if bad:
+        return {"msg": bad}, 400
+    title = d["title"]
     desc = d.get("description","")
     status = d.get("status","todo")
-    email = get_jwt().get("email")
 
-    with get_db().cursor() as c:
-        c.execute("SELECT id FROM users WHERE email=%s", (email,))
-        u = c.fetchone()
-        if not u: return {"msg":"user not found"}, 404
-        c.execute("""INSERT INTO tasks(title,description,status,user_id,created_at)
-                     VALUES(%s,%s,%s,%s,%s)""",
-                  (title, desc, status, u["id"], datetime.datetime.utcnow()))
-    return {"msg":"created"}, 201
+    try:
+        tid = repo.tasks.create(current_user_id(), title, desc, status, datetime.datetime.utcnow())
+    except repo.IntegrityError:
+        # token geçerli ama kullanıcı silinmiş (FK)
+        return {"msg":"user not found"}, 404
+    return {"msg":"created", "id": tid}, 201
 
+# PUT ve PATCH: yalnızca gönderilen alanlar güncellenir (eksik alan NULL yazılmaz)
 @tasks_bp.put("/<int:tid>")
+@tasks_bp.patch("/<int:tid>")
 @jwt_required()
 def update_task(tid):
-    d = request.get_json() or {}
-    title = d.get("title")
-    desc  = d.get("description")
-    status= d.get("status","todo")
-    claims = get_jwt()
-    role = claims.get("role")
-    email = claims.get("email")
-
-    with get_db().cursor() as c:
-        c.execute("""SELECT t.id, u.email AS owner_email
-                     FROM tasks t JOIN users u ON u.id=t.user_id
-                     WHERE t.id=%s""", (tid,))
-        row = c.fetchone()
-        if not row: return {"msg":"not found"}, 404
-        if role != "admin" and row["owner_email"] != email:
-            return {"msg":"forbidden"}, 403
-        c.execute("""UPDATE tasks
-                     SET title=%s, description=%s, status=%s, updated_at=%s
-                     WHERE id=%s""",
-                  (title, desc, status, datetime.datetime.utcnow(), tid))
-    return {"msg":"updated"}, 200
+    d = request.get_json(silent=True)
+    if not isinstance(d, dict) or not any(f in d for f in _PATCHABLE):
+        return {"msg":"nothing to update"}, 400
+    bad = _invalid(d)
+    if bad:
+        return {"msg": bad}, 400
+    err = repo.tasks.update(tid, _viewer(), d, datetime.datetime.utcnow())
+    return _error(err) if err else ({"msg":"updated"}, 200)
+
+@tasks_bp.put("/<int:tid>/toggle")
+@jwt_required()
+def toggle_task(tid):
+    err = repo.tasks.toggle(tid, _viewer(), datetime.datetime.utcnow())
+    return _error(err) if err else ({"msg":"toggled"}, 200)
 
 @tasks_bp.delete("/<int:tid>")
 @jwt_required()
 def delete_task(tid):
-    claims = get_jwt()
-    role = claims.get("role")
-    email = claims.get("email")
-    with get_db().cursor() as c:
-        c.execute("""SELECT t.id, u.email AS owner_email
-                     FROM tasks t JOIN users u ON u.id=t.user_id
-                     WHERE t.id=%s""", (tid,))
-        row = c.fetchone()
-        if not row: return {"msg":"not found"}, 404
-        if role != "admin" and row["owner_email"] != email:
-            return {"msg":"forbidden"}, 403
-        c.execute("DELETE FROM tasks WHERE id=%s", (tid,))
-    return {"msg":"deleted"}, 200
+    err = repo.tasks.delete(tid, _viewer(), datetime.datetime.utcnow())
+    return _error(err) if err else ({"msg":"deleted"}, 200)
+
+# şema sütun uzunlukları (tasks.title VARCHAR(255), tasks.status VARCHAR(20))
+TITLE_MAX = 255
+STATUS_MAX = 20
+
+def _invalid(values, creating=False):
+    """Field checks shared by single and bulk writes -> error message, or None when valid."""
+    if not isinstance(values, dict):
+        return "object required"
+    if (creating or "title" in values) and not (isinstance(values.get("title"), str) and values["title"]):
+        return "title required"
+    if len(values.get("title") or "") > TITLE_MAX:
+        return f"title too long (max {TITLE_MAX})"
+    if "status" in values and not (isinstance(values["status"], str) and 0 < len(values["status"]) <= STATUS_MAX):
+        return f"status must be a string of 1-{STATUS_MAX} characters"
+    if values.get("description") is not None and not isinstance(values["description"], str):
+        return "description must be a string or null"
+    return None
+
+# ---------- Bulk: tek transaction, çok satırlı INSERT / küme bazlı UPDATE-DELETE ----------
+BULK_MAX = int(os.getenv("TASKS_BULK_MAX", "500"))
+
+def _bulk_items(key):
+    d = request.get_json(silent=True)
+    items = d.get(key) if isinstance(d, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, ({"msg": f"{key}: non-empty list required"}, 400)
+    if len(items) > BULK_MAX:
+        return None, ({"msg": f"too many items (max {BULK_MAX})"}, 413)
+    return items, None
+
+def _bulk_result(results):
+    ok = sum(1 for r in results if r.get("ok"))
+    return jsonify(results=results, ok=ok, failed=len(results) - ok), 200
+
+def _check_ids(items, id_of):
+    """Per-item validation of ids; returns ({index: id} for valid items, results)."""
+    results, ids, seen = [], {}, set()
+    for i, it in enumerate(items):
+        tid = id_of(it)
+        if not isinstance(tid, int) or isinstance(tid, bool):
+            results.append({"index": i, "ok": False, "error": "id required"})
+        elif tid in seen:
+            results.append({"index": i, "id": tid, "ok": False, "error": "duplicate id"})
+        else:
+            seen.add(tid)
+            ids[i] = tid
+            results.append({"index": i, "id": tid, "ok": True})
+    return ids, results
+
+def _apply_errors(ids, results, errors):
+    for i, tid in ids.items():
+        if tid in errors:
+            results[i].update(ok=False, error=errors[tid])
+
+@tasks_bp.post("/bulk")
+@jwt_required()
+def bulk_create():
+    items, err = _bulk_items("items")
+    if err: return err
+    results, rows = [], []
+    now = datetime.datetime.utcnow()
+    for i, it in enumerate(items):
+        bad = _invalid(it, creating=True)
+        if bad:
+            results.append({"index": i, "ok": False, "error": bad})
+            continue
+        results.append({"index": i, "ok": True})
+        rows.append((i, it["title"], it.get("description", ""), it.get("status", "todo")))
+    if rows:
+        new_ids = repo.tasks.bulk_create(current_user_id(), [r[1:] for r in rows], now)
+        for (i, *_rest), tid in zip(rows, new_ids):
+            results[i]["id"] = tid
+    return _bulk_result(results)
+
+@tasks_bp.patch("/bulk")
+@jwt_required()
+def bulk_update():
+    items, err = _bulk_items("items")
+    if err: return err
+    items = [it if isinstance(it, dict) else {} for it in items]
+    ids, results = _check_ids(items, lambda it: it.get("id"))
+    for i in list(ids):
+        bad = "nothing to update" if not any(f in items[i] for f in _PATCHABLE) else _invalid(items[i])
+        if bad:
+            results[i].update(ok=False, error=bad)
+            del ids[i]
+    if ids:
+        changes = {tid: {f: items[i][f] for f in _PATCHABLE if f in items[i]} for i, tid in ids.items()}
+        errors = repo.tasks.bulk_update(changes, _viewer(), datetime.datetime.utcnow())
+        _apply_errors(ids, results, errors)
+    return _bulk_result(results)
+
+@tasks_bp.delete("/bulk")
+@jwt_required()
+def bulk_delete():
+    raw, err = _bulk_items("ids")
+    if err: return err
+    ids, results = _check_ids(raw, lambda tid: tid)
+    if ids:
+        errors = repo.tasks.bulk_delete(list(ids.values()), _viewer(), datetime.datetime.utcnow())
+        _apply_errors(ids, results, errors)
+    return _bulk_result(results)
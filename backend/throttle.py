@@ -0,0 +1,66 @@
+# backend/throttle.py
+# Bellek içi kayan pencere sayacı (process başına); login/register isteklerini sınırlar
+import collections, hmac, os, threading, time
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+# frontend ile paylaşılan sır: yalnızca bunu taşıyan isteğin X-Forwarded-For'u kabul edilir
+FORWARDED_SECRET = os.getenv("FORWARDED_SECRET", "")
+_VIA_FRONTEND = "taskapp.via_frontend"
+
+
+class SlidingWindow:
+    def __init__(self, limit: int, window: float, max_keys: int = 100_000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits = collections.OrderedDict()  # key -> deque[timestamp]
+        self._lock = threading.Lock()
+
+    def hit(self, key) -> float:
+        """Record an attempt; returns 0 if allowed, else seconds until retry."""
+        now = time.monotonic()
+        with self._lock:
+            q = self._hits.get(key)
+            if q is None:
+                q = self._hits[key] = collections.deque()
+                while len(self._hits) > self.max_keys:
+                    self._hits.popitem(last=False)
+            else:
+                self._hits.move_to_end(key)
+            while q and now - q[0] >= self.window:
+                q.popleft()
+            if len(q) >= self.limit:
+                return self.window - (now - q[0])
+            q.append(now)
+            return 0.0
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+
+class FrontendProxyFix:
+    """WSGI middleware: ProxyFix(x_for=1) for requests from the frontend, identified by
+    the X-Forwarded-Secret header; anyone else's X-Forwarded-For is dropped."""
+
+    def __init__(self, app, secret):
+        self.plain = app
+        self.fixed = ProxyFix(app, x_for=1)
+        self.secret = secret.encode("utf-8")
+
+    def __call__(self, environ, start_response):
+        given = environ.pop("HTTP_X_FORWARDED_SECRET", "").encode("latin-1")
+        if self.secret and hmac.compare_digest(given, self.secret):
+            environ[_VIA_FRONTEND] = True
+            if "HTTP_X_FORWARDED_FOR" in environ:
+                return self.fixed(environ, start_response)
+            return self.plain(environ, start_response)
+        environ.pop("HTTP_X_FORWARDED_FOR", None)
+        return self.plain(environ, start_response)
+
+def client_ip(request):
+    """Caller's IP for per-IP limits; None when the frontend could not tell us the browser's
+    (its own pod address would put every user under one key)."""
+    if request.environ.get(_VIA_FRONTEND) and "werkzeug.proxy_fix.orig" not in request.environ:
+        return None
+    return request.remote_addr
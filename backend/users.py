@@ -1,28 +1,49 @@
 # backend/users.py
+import datetime, logging, os, time
 from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt
-from models import get_db
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+import repository as repo
+from export import ndjson_response
 
+log = logging.getLogger(__name__)
 users_bp = Blueprint("users", __name__, url_prefix="/api/users")
 
+DELETE_BATCH = int(os.getenv("USER_DELETE_BATCH", "500"))
+DELETE_BUDGET = float(os.getenv("USER_DELETE_BUDGET", "10"))  # saniye; gunicorn timeout'unun altında
+
 def is_admin():
     return get_jwt().get("role") == "admin"
 
+def current_user_id() -> int:
+    # login: identity=str(u["id"]) -> email ile users sorgusuna gerek yok
+    return int(get_jwt_identity())
+
 @users_bp.get("")
 @jwt_required()
 def list_users():
     claims = get_jwt()
-    print("USERS_LIST role=", claims.get("role"))  # <-- debug: terminalde görülecek
+    log.debug("users list requested, role=%s", claims.get("role"))
     if claims.get("role") != "admin":
         return {"msg": "forbidden"}, 403
-    with get_db().cursor() as c:
-        c.execute("SELECT id, email, role, created_at FROM users ORDER BY id DESC")
-        return jsonify(items=c.fetchall()), 200
+    return jsonify(items=repo.users.list_all()), 200
+
+@users_bp.get("/export")
+@jwt_required()
+def export_users():
+    if not is_admin():
+        return {"msg": "forbidden"}, 403
+    return ndjson_response(repo.users.stream_all(), "users.ndjson")
+
 @users_bp.delete("/<int:uid>")
 @jwt_required()
 def delete_user(uid: int):
     if not is_admin():
         return {"msg": "forbidden"}, 403
-    with get_db().cursor() as c:
-        c.execute("DELETE FROM users WHERE id=%s", (uid,))
+    # görevler küçük commit'li batch'lerle silinir; süre dolarsa 202, istek tekrarlanınca devam eder
+    err = repo.users.delete(uid, datetime.datetime.utcnow(), batch=DELETE_BATCH,
+                            deadline=time.monotonic() + DELETE_BUDGET)
+    if err == repo.NOT_FOUND:
+        return {"msg": "not found"}, 404
+    if err == repo.PARTIAL:
+        return {"msg": "deletion in progress, repeat the request"}, 202
     return {"msg": "deleted"}, 200
@@ -0,0 +1,4 @@
+# backend/wsgi.py — üretim girişi: gunicorn -c gunicorn.conf.py wsgi:app
+from app import create_app
+
+app = create_app()
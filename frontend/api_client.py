@@ -0,0 +1,179 @@
+# api_client.py — backend API istemcisi
+# Tek keep-alive Session (bağlantı havuzu + retry + timeout); kimlik ve görev listesi
+# session_state'te tutulur, create/toggle/delete yerel listeye uygulanır (yeniden çekme yok),
+# liste yalnızca ETag ile koşullu GET üzerinden tazelenir.
+import os, time, requests, streamlit as st
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BACKEND = os.getenv("BACKEND_URL", "http://localhost:8000")
+AUTH_BASE = os.getenv("AUTH_BASE", "/api/auth")  # backend login path base
+TIMEOUT = (float(os.getenv("API_CONNECT_TIMEOUT", "3")), float(os.getenv("API_READ_TIMEOUT", "10")))
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+REVALIDATE_SECONDS = float(os.getenv("TASKS_REVALIDATE_SECONDS", "15"))
+PAGE_LIMIT = 500  # backend MAX_LIMIT
+# backend ile paylaşılan sır: iletilen tarayıcı IP'sine (X-Forwarded-For) yalnızca bununla güvenilir
+FORWARDED_SECRET = os.getenv("FORWARDED_SECRET", "")
+# frontend önündeki güvenilir proxy sayısı (ingress vb.); 0 = doğrudan erişim (NodePort)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+# backend'in "yazdıktan sonra birincilden oku" çerezi; kullanıcı başına session_state'te tutulur
+STICKY_COOKIE = "db_primary"
+
+@st.cache_resource
+def session() -> requests.Session:
+    """One pooled session per Streamlit process (shared by all browser sessions; no auth state on it)."""
+    s = requests.Session()
+    # tüm tarayıcı oturumları bu Session'ı paylaşır: çerez kavanozu bir kullanıcının çerezini
+    # herkese gönderirdi -> hiç çerez saklanmaz (kullanıcıya ait olanlar session_state'te)
+    s.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # POST / toggle PUT idempotent değil: yalnızca GET ve DELETE yeniden denenir
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                  allowed_methods=frozenset({"GET", "DELETE"}), respect_retry_after_header=True,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def _browser_ip():
+    # backend'in login/register IP sınırı frontend pod'unun değil tarayıcının adresine uygulansın.
+    # Varsayılan soket eşi: X-Forwarded-For tarayıcıdan gelir, önünde güvenilir proxy yoksa uydurulabilir.
+    ctx = getattr(st, "context", None)
+    if ctx is None:
+        return None
+    if TRUSTED_PROXY_HOPS > 0:
+        # proxy'lerin sağdan eklediği adresler; sol taraf istemcinin yazdığıdır, okunmaz
+        hops = [h.strip() for h in (getattr(ctx, "headers", None) or {}).get("X-Forwarded-For", "").split(",") if h.strip()]
+        return hops[-TRUSTED_PROXY_HOPS] if len(hops) >= TRUSTED_PROXY_HOPS else None
+    return getattr(ctx, "ip_address", None)
+
+def _headers(token=None):
+    token = token or (st.session_state.get("auth") or {}).get("token")
+    h = {"Authorization": f"Bearer {token}"} if token else {}
+    if FORWARDED_SECRET:
+        h["X-Forwarded-Secret"] = FORWARDED_SECRET
+        ip = _browser_ip()
+        if ip:
+            h["X-Forwarded-For"] = ip
+    return h
+
+def _call(method, path, token=None, headers=None, **kw):
+    sticky = st.session_state.get(STICKY_COOKIE)
+    r = session().request(method, f"{BACKEND}{path}", headers={**_headers(token), **(headers or {})},
+                          cookies={STICKY_COOKIE: sticky} if sticky else None, timeout=TIMEOUT, **kw)
+    if r.cookies.get(STICKY_COOKIE):
+        st.session_state[STICKY_COOKIE] = r.cookies[STICKY_COOKIE]
+    return r
+
+# ---------- Auth ----------
+def login(email: str, password: str):
+    """-> (auth dict, error). Identity is fetched once here and kept in session_state."""
+    try:
+        r = _call("POST", f"{AUTH_BASE}/login", json={"email": email, "password": password})
+        if r.status_code != 200:
+            return None, f"Login failed ({r.status_code}): {r.text}"
+        data = r.json()
+        token = data.get("access_token") or data.get("token")
+        auth = {"token": token, "role": data.get("role"), "email": email}
+        if token and not auth["role"]:
+            w = _call("GET", "/whoami", token=token)
+            if w.ok:
+                who = w.json()
+                auth["email"] = who.get("email", email)
+                auth["role"] = who.get("role")
+        invalidate()  # önceki oturumun listesi kalmasın
+        return auth, None
+    except Exception as e:
+        return None, f"Request error: {e}"
+
+def logout():
+    st.session_state.auth = None
+    st.session_state.pop(STICKY_COOKIE, None)
+    invalidate()
+
+# ---------- Görev listesi cache'i ----------
+def _cache():
+    return st.session_state.get("tasks_cache")
+
+def invalidate():
+    st.session_state.pop("tasks_cache", None)
+
+def tasks_list(force=False):
+    """Cached task list; revalidated with If-None-Match at most every REVALIDATE_SECONDS."""
+    cache = _cache()
+    if cache and not force and time.monotonic() - cache["checked"] < REVALIDATE_SECONDS:
+        return cache["items"]
+    try:
+        cond = {"If-None-Match": cache["etag"]} if cache and cache.get("etag") else {}
+        r = _call("GET", "/api/tasks", headers=cond, params={"limit": PAGE_LIMIT})
+        if r.status_code == 304:
+            cache["checked"] = time.monotonic()
+            return cache["items"]
+        if not r.ok:
+            return cache["items"] if cache else []
+        etag, js = r.headers.get("ETag"), r.json()
+        if isinstance(js, list):
+            items = js
+        else:
+            items = list(js.get("items") or [])
+            # sonraki sayfalar (keyset cursor); ETag ilk sayfanın sürümünü temsil eder
+            while js.get("next_cursor"):
+                r = _call("GET", "/api/tasks", params={"limit": PAGE_LIMIT, "cursor": js["next_cursor"]})
+                if not r.ok:
+                    etag = None  # eksik liste: sonraki çağrıda tam çekilsin
+                    break
+                js = r.json()
+                items.extend(js.get("items") or [])
+        st.session_state.tasks_cache = {"items": items, "etag": etag, "checked": time.monotonic()}
+        return items
+    except Exception:
+        return cache["items"] if cache else []
+
+def _local(apply):
+    # yerel listeye uygula; ETag artık eski, bir sonraki doğrulama tam liste getirir
+    cache = _cache()
+    if cache:
+        cache["items"] = apply(cache["items"])
+
+def _failed():
+    # sunucu reddetti / ulaşılamadı: yerel liste güvenilmez, sonraki çizimde yeniden çek
+    invalidate()
+    return False
+
+# ---------- Mutasyonlar (yeniden çekme yok) ----------
+def task_create(title, description=""):
+    try:
+        r = _call("POST", "/api/tasks", json={"title": title, "description": description})
+        if not r.ok:
+            return _failed()
+        tid = (r.json() or {}).get("id")
+        if tid is None:
+            invalidate()
+        else:
+            _local(lambda items: items + [{"id": tid, "title": title, "description": description, "status": "todo"}])
+        return True
+    except Exception:
+        return _failed()
+
+def task_toggle(task_id):
+    try:
+        if not _call("PUT", f"/api/tasks/{task_id}/toggle").ok:
+            return _failed()
+        def flip(t):
+            if t.get("id") != task_id:
+                return t
+            return {**t, "status": "todo" if str(t.get("status", "")).lower() == "done" else "done"}
+        _local(lambda items: [flip(t) for t in items])
+        return True
+    except Exception:
+        return _failed()
+
+def task_delete(task_id):
+    try:
+        if not _call("DELETE", f"/api/tasks/{task_id}").ok:
+            return _failed()
+        _local(lambda items: [t for t in items if t.get("id") != task_id])
+        return True
+    except Exception:
+        return _failed()
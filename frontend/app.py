@@ -1,8 +1,6 @@
 # app.py — minimal login + Task UI (list/add/toggle/delete)
-import os, requests, streamlit as st
-
-BACKEND = os.getenv("BACKEND_URL", "http://localhost:8000")
-AUTH_BASE = os.getenv("AUTH_BASE", "/api/auth")  # backend login path base
+import streamlit as st
+from api_client import login as api_login, logout, tasks_list, task_create, task_toggle, task_delete
 
 st.set_page_config(page_title="Task Manager", page_icon="✅", layout="centered")
 
@@ -31,68 +29,6 @@ h1 { margin-bottom: 1.2rem; letter-spacing:.3px; }
 </style>
 """, unsafe_allow_html=True)
 
-# ---------- Auth helpers ----------
-def api_login(email: str, password: str):
-    try:
-        url = f"{BACKEND}{AUTH_BASE}/login"
-        r = requests.post(url, json={"email": email, "password": password}, timeout=10)
-        if r.status_code != 200:
-            return None, f"Login failed ({r.status_code}): {r.text}"
-        data = r.json()
-        token = data.get("access_token") or data.get("token")
-        role  = data.get("role")
-        return {"token": token, "role": role, "email": email}, None
-    except Exception as e:
-        return None, f"Request error: {e}"
-
-# ---------- Task API helpers ----------
-def api_headers():
-    a = st.session_state.get("auth") or {}
-    t = a.get("token")
-    return {"Authorization": f"Bearer {t}"} if t else {}
-
-def tasks_list():
-    try:
-        r = requests.get(f"{BACKEND}/api/tasks", headers=api_headers(), timeout=10)
-        if not r.ok:
-            return []
-        js = r.json()
-        # API bazen { "items": [...] } döndürüyor
-        if isinstance(js, dict) and isinstance(js.get("items"), list):
-            return js["items"]
-        # yoksa zaten listeyse onu döndür
-        if isinstance(js, list):
-            return js
-        return []
-    except Exception:
-        return []
-
-def task_create(title, description=""):
-    try:
-        r = requests.post(
-            f"{BACKEND}/api/tasks",
-            headers={**api_headers(), "Content-Type": "application/json"},
-            json={"title": title, "description": description},
-            timeout=10
-        )
-        return r.ok
-    except Exception:
-        return False
-
-def task_toggle(task_id):
-    try:
-        r = requests.put(f"{BACKEND}/api/tasks/{task_id}/toggle", headers=api_headers(), timeout=10)
-        return r.ok
-    except Exception:
-        return False
-
-def task_delete(task_id):
-    try:
-        r = requests.delete(f"{BACKEND}/api/tasks/{task_id}", headers=api_headers(), timeout=10)
-        return r.ok
-    except Exception:
-        return False
-# -------------------------------------
 
 def _is_done(t):
     """completed: bool veya status: 'done' ise True."""
@@ -110,27 +46,11 @@ if "auth" not in st.session_state:
 # already logged in? -> Show Task UI
 if st.session_state.auth and st.session_state.auth.get("token"):
 
-    # ensure role/email via whoami (added)
-    try:
-        a = st.session_state.auth
-        if not a.get("role") and a.get("token"):
-            r = requests.get(
-                f"{BACKEND}/whoami",
-                headers={"Authorization": f"Bearer {a['token']}"},
-                timeout=5
-            )
-            if r.ok:
-                who = r.json()
-                a["email"] = who.get("email", a.get("email"))
-                a["role"]  = who.get("role")
-    except Exception:
-        pass
-
     # Header (logged-in info + logout)
     a = st.session_state.auth
     st.success(f"Signed in as **{a.get('email')}**  ·  role: **{a.get('role') or 'unknown'}**")
     if st.button("Logout"):
-        st.session_state.auth = None
+        logout()
         st.rerun()
 
     # -------- Task UI --------